@@ -0,0 +1,132 @@
+"""
+Benchmark the scheduler, queue model and visualizer hot paths on seeded
+synthetic workloads and store the results as JSON for later comparison.
+
+    python -m mlfq-simulator.benchmarks.run --scale small medium --output bench.json
+    python -m mlfq-simulator.benchmarks.run --compare bench.json
+
+Every benchmark runs in a fresh process, so the peak RSS reported is its own;
+so do the correctness checks some of them need first.
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from .suite import BENCHMARKS, CHECKS, SCALES
+
+RATES = ('ticks', 'events', 'frames', 'starts')
+
+def peak_rss_mb():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024 if sys.platform == 'darwin' else 1024)
+
+def run_benchmark(name, scale, seed, repeat):
+    """Run one benchmark repeat times and return its result row, with the fastest time."""
+    seconds, counts = min((BENCHMARKS[name](SCALES[scale], seed) for _ in range(repeat)),
+                          key=lambda result: result[0])
+    row = {'benchmark': name, 'scale': scale, 'seconds': seconds}
+    for rate in RATES:
+        if rate in counts:
+            row[rate] = counts[rate]
+            row[f'{rate}_per_sec'] = counts[rate] / seconds if seconds else 0.0
+    row['peak_rss_mb'] = peak_rss_mb()
+    return row
+
+def run_check(name, scale, seed):
+    CHECKS[name](SCALES[scale], seed)
+
+def run_isolated(name, scale, seed, repeat):
+    # A spawned worker starts from a clean interpreter, unlike a forked one
+    context = multiprocessing.get_context('spawn')
+    if name in CHECKS:
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            executor.submit(run_check, name, scale, seed).result()
+    with ProcessPoolExecutor(1, mp_context=context) as executor:
+        return executor.submit(run_benchmark, name, scale, seed, repeat).result()
+
+def compare(rows, baseline, tolerance):
+    """
+    Compare result rows with a baseline result file's rows and return the
+    regressions: rates lower, or peak RSS higher, by more than tolerance.
+    """
+    previous = {(row['benchmark'], row['scale']): row for row in baseline}
+    regressions = []
+    for row in rows:
+        old = previous.get((row['benchmark'], row['scale']))
+        if old is None:
+            continue
+        for key in [f'{rate}_per_sec' for rate in RATES] + ['peak_rss_mb']:
+            if key not in row or key not in old or not old[key]:
+                continue
+            change = row[key] / old[key] - 1
+            worse = change > tolerance if key == 'peak_rss_mb' else change < -tolerance
+            print(f"  {row['benchmark']:<22} {row['scale']:<7} {key:<16} {old[key]:>14.1f} -> {row[key]:>14.1f}"
+                  f" ({change:+.1%}){'  REGRESSION' if worse else ''}")
+            if worse:
+                regressions.append((row['benchmark'], row['scale'], key, change))
+    return regressions
+
+def format_row(row):
+    rates = ' | '.join(f"{row[f'{rate}_per_sec']:,.0f} {rate}/s" for rate in RATES if rate in row)
+    return (f"{row['benchmark']:<22} {row['scale']:<7} {row['seconds']:8.3f}s  {rates}"
+            f" | peak RSS {row['peak_rss_mb']:.0f} MB")
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m mlfq-simulator.benchmarks.run',
+                                     description='Benchmark the MLFQ simulator hot paths.')
+    parser.add_argument('--scale', nargs='+', choices=list(SCALES), default=['small', 'medium'],
+                        help='workload scales to run (default: small medium)')
+    parser.add_argument('--benchmark', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS),
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('--seed', type=int, default=1, help='workload seed (default: 1)')
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per benchmark, the fastest is kept (default: 3)')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', metavar='BASELINE', help='compare with the results in this JSON file')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='relative change reported as a regression (default: 0.1)')
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error("--repeat must be positive")
+
+    rows = []
+    for scale in args.scale:
+        for name in args.benchmark:
+            row = run_isolated(name, scale, args.seed, args.repeat)
+            print(format_row(row))
+            rows.append(row)
+
+    if args.output:
+        result = {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+            'results': rows,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print(f"Results in {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        print(f"Compared with {args.compare}:")
+        regressions = compare(rows, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%}")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
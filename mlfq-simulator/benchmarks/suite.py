@@ -0,0 +1,245 @@
+import contextlib
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from ..models.process import Process
+from ..models.promotion_index import PromotionIndex
+from ..models.queue import Queue
+from ..services.clock_service import MaxSpeedClock
+from ..services.event_scheduler import EventDrivenMLFQ
+from ..services.logging_service import QueueLogger
+from ..services.mlfq_scheduler import MLFQ
+from ..services.queue_service import QueueService
+from ..services.workload_service import generate_workload
+
+# Sizes per scale: processes for the scheduler and queue benchmarks, frames
+# and processes per queue for the visualizer ones, fresh interpreters for
+# the startup one and random workloads the vectorized engine is checked on
+SCALES = {
+    'small': {'processes': 200, 'frames': 10, 'queue_length': 5, 'starts': 5, 'checks': 500},
+    'medium': {'processes': 2000, 'frames': 40, 'queue_length': 20, 'starts': 10, 'checks': 1000},
+    'large': {'processes': 20000, 'frames': 160, 'queue_length': 50, 'starts': 20, 'checks': 3000},
+}
+TIME_QUANTUM = [2, 4, 8]
+PROMOTION_THRESHOLD = 8
+
+PACKAGE = __package__.rpartition('.')[0]
+# What a headless run or a sweep worker imports, none of which may pull in
+# the visualization or GUI stack
+STARTUP_MODULES = ['cli', 'services', 'services.sweep_service', 'controllers.app']
+HEAVY_MODULES = ['matplotlib', 'numpy', 'imageio', 'PIL', 'tkinter']
+STARTUP_SCRIPT = '''
+import importlib, json, sys, time
+start = time.perf_counter()
+for module in sys.argv[2:]:
+    importlib.import_module(sys.argv[1] + '.' + module)
+seconds = time.perf_counter() - start
+print(json.dumps({'seconds': seconds, 'heavy': [name for name in %r if name in sys.modules]}))
+''' % HEAVY_MODULES
+
+def workload(count, seed):
+    """The same open-system workload for a given count and seed: Poisson arrivals at about 90% load."""
+    return list(generate_workload(count, arrival_rate=0.09, mean_burst=10, seed=seed))
+
+def bench_mlfq_run(sizes, seed):
+    processes = workload(sizes['processes'], seed)
+    scheduler = MLFQ(None, processes, TIME_QUANTUM, PROMOTION_THRESHOLD, None,
+                     logger=QueueLogger('off'), clock=MaxSpeedClock())
+    start = time.perf_counter()
+    gantt_events = scheduler.run()
+    seconds = time.perf_counter() - start
+    return seconds, {'ticks': scheduler.metrics.end_time, 'events': len(gantt_events)}
+
+def bench_event_driven_run(sizes, seed):
+    processes = workload(sizes['processes'], seed)
+    scheduler = EventDrivenMLFQ(processes, TIME_QUANTUM, PROMOTION_THRESHOLD)
+    start = time.perf_counter()
+    gantt_events = scheduler.run()
+    seconds = time.perf_counter() - start
+    return seconds, {'ticks': gantt_events[-1][2], 'events': len(gantt_events)}
+
+def check_vectorized(trials, seed):
+    """
+    Run VectorizedMLFQ and EventDrivenMLFQ on trials seeded random workloads,
+    with 1 to 4 queues, thresholds from 0 up and with or without arrivals,
+    and raise AssertionError on the first difference in Gantt events or
+    completion times. The closed-form promotions of the vectorized engine
+    are easy to break, so this runs before it is benchmarked.
+    """
+    from ..services.vector_scheduler import VectorizedMLFQ
+    rng = random.Random(seed)
+    for trial in range(trials):
+        num_queues = rng.randint(1, 4)
+        time_quantum = [rng.randint(1, 8) for _ in range(num_queues)]
+        threshold = rng.choice([0, 1, 2, 3, 5, 8, 20, 1000])
+        spread = rng.choice([0, 10, 60])
+        processes = sorted((Process(i + 1, rng.randint(1, 40), rng.randint(0, spread))
+                            for i in range(rng.randint(1, 30))), key=lambda p: p.arrival_time)
+        # Taken before the runs, which use up the burst times
+        spec = [(p.process_id, p.burst_time, p.arrival_time) for p in processes]
+        vectorized = VectorizedMLFQ.from_processes(processes, time_quantum, threshold, num_queues)
+        vectorized.run()
+        expected = EventDrivenMLFQ(processes, time_quantum, threshold, num_queues=num_queues).run()
+        completion_times = {process_id: end for process_id, _, end, _ in expected}
+        if (vectorized.gantt_events() != expected
+                or dict(zip(vectorized.process_ids.tolist(), vectorized.completion_times.tolist()))
+                != completion_times):
+            raise AssertionError(f"VectorizedMLFQ differs from EventDrivenMLFQ on trial {trial} of seed {seed}: "
+                                 f"quanta {time_quantum}, threshold {threshold}, "
+                                 f"(process_id, burst_time, arrival_time) {spec}")
+
+def _vectorized_bursts(sizes, seed):
+    # Everything arriving at once, the long queues this engine is made for
+    return [p.burst_time for p in workload(sizes['processes'], seed)]
+
+def check_vectorized_run(sizes, seed):
+    """Check VectorizedMLFQ on the random workloads and on the one bench_vectorized_run times."""
+    from ..services.vector_scheduler import VectorizedMLFQ
+    check_vectorized(sizes['checks'], seed)
+    bursts = _vectorized_bursts(sizes, seed)
+    expected = EventDrivenMLFQ([Process(i + 1, burst) for i, burst in enumerate(bursts)],
+                               TIME_QUANTUM, PROMOTION_THRESHOLD).run()
+    scheduler = VectorizedMLFQ(bursts, TIME_QUANTUM, PROMOTION_THRESHOLD)
+    scheduler.run()
+    if scheduler.gantt_events() != expected:
+        raise AssertionError(f"VectorizedMLFQ differs from EventDrivenMLFQ on the {sizes['processes']}-process workload")
+
+def bench_vectorized_run(sizes, seed):
+    # Imported here so the other benchmarks don't pay for NumPy
+    from ..services.vector_scheduler import VectorizedMLFQ
+    scheduler = VectorizedMLFQ(_vectorized_bursts(sizes, seed), TIME_QUANTUM, PROMOTION_THRESHOLD)
+    start = time.perf_counter()
+    scheduler.run()
+    seconds = time.perf_counter() - start
+    return seconds, {'ticks': int(scheduler.gantt['end_time'][-1]), 'events': len(scheduler.gantt)}
+
+def bench_promote_processes(sizes, seed):
+    rng = random.Random(seed)
+    queues = [Queue(i) for i in range(len(TIME_QUANTUM))]
+    queue_service = QueueService(queues)
+    count = sizes['processes']
+    promotions = 0
+    for i in range(count):
+        priority = rng.randrange(1, len(queues))
+        queues[priority].enqueue(Process(i + 1, 1), rng.randrange(count))
+        promotions += priority
+    # Every process climbs to queue 0, one level per threshold
+    end_time = count + PROMOTION_THRESHOLD * len(queues)
+    start = time.perf_counter()
+    for current_time in range(end_time):
+        queue_service.promote_processes(current_time, PROMOTION_THRESHOLD)
+    seconds = time.perf_counter() - start
+    assert len(queues[0]) == count
+    return seconds, {'ticks': end_time, 'events': promotions}
+
+def bench_queue_ops(sizes, seed):
+    # Queue 1 with a promotion index, like every queue below the top one
+    queue = Queue(1, PromotionIndex())
+    processes = [Process(i + 1, 1) for i in range(sizes['processes'])]
+    rounds = 10
+    start = time.perf_counter()
+    for r in range(rounds):
+        for process in processes:
+            queue.enqueue(process, r)
+        while queue.dequeue() is not None:
+            pass
+    seconds = time.perf_counter() - start
+    return seconds, {'events': 2 * rounds * len(processes)}
+
+def _visualizer(output_dir):
+    # Imported here so the scheduler benchmarks don't pay for matplotlib
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+    from ..services.visualizer_service import VisualizerService
+    figure = Figure(figsize=(6, 4), dpi=100)
+    gantt_figure = Figure(figsize=(10, 2), dpi=100)
+    return VisualizerService(FigureCanvasAgg(figure), figure, FigureCanvasAgg(gantt_figure), gantt_figure,
+                             output_dir=output_dir)
+
+def _filled_queues(sizes, seed):
+    rng = random.Random(seed)
+    queues = [Queue(i) for i in range(len(TIME_QUANTUM))]
+    process_id = 1
+    for queue in queues:
+        for _ in range(sizes['queue_length']):
+            queue.enqueue(Process(process_id, rng.randint(1, 20)), rng.randrange(10))
+            process_id += 1
+    return queues
+
+def bench_save_queue_image(sizes, seed):
+    queues = _filled_queues(sizes, seed)
+    with tempfile.TemporaryDirectory() as output_dir:
+        visualizer = _visualizer(output_dir)
+        visualizer.assign_colors([p for queue in queues for p in queue])
+        start = time.perf_counter()
+        for current_time in range(sizes['frames']):
+            visualizer.save_queue_image(queues, current_time)
+        seconds = time.perf_counter() - start
+        visualizer.animation.close()
+    return seconds, {'frames': sizes['frames']}
+
+def bench_generate_gantt_chart(sizes, seed):
+    processes = workload(sizes['frames'], seed)
+    gantt_events = EventDrivenMLFQ(processes, TIME_QUANTUM, PROMOTION_THRESHOLD).run()[:sizes['frames']]
+    with tempfile.TemporaryDirectory() as output_dir:
+        visualizer = _visualizer(output_dir)
+        visualizer.assign_colors(processes)
+        visualizer.gantt_events = gantt_events
+        start = time.perf_counter()
+        visualizer.generate_gantt_chart()
+        seconds = time.perf_counter() - start
+        visualizer.gantt_animation.close()
+    return seconds, {'frames': len(gantt_events)}
+
+def bench_create_animation(sizes, seed):
+    queues = _filled_queues(sizes, seed)
+    with tempfile.TemporaryDirectory() as output_dir:
+        visualizer = _visualizer(output_dir)
+        visualizer.save_queue_image(queues, 0)
+        visualizer.animation.close()
+        frame = visualizer.canvas.buffer_rgba()
+        visualizer = _visualizer(output_dir)
+        # Encoding the streamed frames and finishing the files, without the drawing
+        start = time.perf_counter()
+        for _ in range(sizes['frames']):
+            visualizer.animation.append(frame)
+        with contextlib.redirect_stdout(io.StringIO()):
+            visualizer.create_animation()
+        seconds = time.perf_counter() - start
+    return seconds, {'frames': sizes['frames']}
+
+def bench_import_startup(sizes, seed):
+    # Each import happens in a new interpreter, like a freshly spawned sweep worker
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    seconds = 0.0
+    for _ in range(sizes['starts']):
+        output = subprocess.run([sys.executable, '-c', STARTUP_SCRIPT, PACKAGE] + STARTUP_MODULES,
+                                cwd=root, capture_output=True, text=True, check=True).stdout
+        result = json.loads(output)
+        if result['heavy']:
+            raise AssertionError(f"Importing the package loads {', '.join(result['heavy'])}")
+        seconds += result['seconds']
+    return seconds, {'starts': sizes['starts']}
+
+BENCHMARKS = {
+    'mlfq_run': bench_mlfq_run,
+    'event_driven_run': bench_event_driven_run,
+    'vectorized_run': bench_vectorized_run,
+    'promote_processes': bench_promote_processes,
+    'queue_ops': bench_queue_ops,
+    'save_queue_image': bench_save_queue_image,
+    'generate_gantt_chart': bench_generate_gantt_chart,
+    'create_animation': bench_create_animation,
+    'import_startup': bench_import_startup,
+}
+
+# Correctness checks run before a benchmark, in a worker of their own so
+# they don't count towards its peak RSS
+CHECKS = {
+    'vectorized_run': check_vectorized_run,
+}
@@ -0,0 +1,296 @@
+"""
+Headless command-line runner. Reads process definitions, runs the
+event-driven scheduler without Tk and writes the results to a directory:
+
+    python -m mlfq-simulator.cli processes.csv --quantum 2 4 8 --threshold 8 --output result
+
+With --sweep-quantum/--sweep-threshold it runs every combination across
+--workers processes and writes one sweep.csv table instead. With --generate
+it simulates a synthetic open-system workload that is generated lazily, and
+only writes the aggregate metrics. --checkpoint saves a snapshot of the run
+at regular intervals, and --resume continues a run from one.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from .models.process import Process
+from .services.event_scheduler import EventDrivenMLFQ
+from .services.logging_service import LOG_LEVELS, JsonlSink, QueueLogger
+from .services.metrics_service import MetricsCollector
+from .services.smp_scheduler import BALANCING_POLICIES, SMPMLFQ
+from .services.snapshot_service import CheckpointWriter, load_checkpoint
+from .services.sweep_service import run_sweep, sweep_grid, write_sweep_results
+from .services.trace_service import TraceRecorder, TraceRenderer
+from .services.workload_service import generate_workload
+
+DEFAULT_QUANTUM = [2, 4, 8]
+DEFAULT_THRESHOLD = 8
+
+def load_processes(path):
+    """
+    Read processes from a JSON list (burst times or objects with burst_time
+    and optional process_id and arrival_time) or a CSV file (a
+    process_id,burst_time[,arrival_time] header, or one burst time per line
+    as in the GUI batch input). Processes with I/O give bursts instead of
+    burst_time: alternating CPU and I/O times, starting and ending with CPU,
+    as a JSON list or a space-separated CSV field.
+    """
+    with open(path, newline='') as f:
+        if path.lower().endswith('.json'):
+            rows = [row if isinstance(row, dict) else {'burst_time': row} for row in json.load(f)]
+        else:
+            lines = [line for line in csv.reader(f) if line and any(field.strip() for field in line)]
+            if lines and not lines[0][0].strip().lstrip('-').isdigit():
+                header = [name.strip() for name in lines[0]]
+                rows = [dict(zip(header, line)) for line in lines[1:]]
+            else:
+                rows = [dict(zip(['process_id', 'burst_time', 'arrival_time'], line)) if len(line) > 1
+                        else {'burst_time': line[0]} for line in lines]
+
+    processes = []
+    process_ids = set()
+    for i, row in enumerate(rows, 1):
+        try:
+            process_id = row.get('process_id')
+            # An absent or empty ID defaults to the row number; 0 is a valid ID
+            process_id = i if process_id is None or str(process_id).strip() == '' else int(process_id)
+            bursts = row.get('bursts')
+            if bursts:
+                bursts = [int(b) for b in (bursts.split() if isinstance(bursts, str) else bursts)]
+            else:
+                bursts = [int(row['burst_time'])]
+            arrival_time = int(row.get('arrival_time') or 0)
+        except (KeyError, TypeError, ValueError):
+            raise ValueError(f"Invalid process definition #{i}: {row}")
+        if len(bursts) % 2 == 0:
+            raise ValueError(f"Bursts of process {process_id} must start and end with a CPU burst")
+        if min(bursts) <= 0:
+            raise ValueError(f"Burst times must be positive for process {process_id}")
+        if arrival_time < 0:
+            raise ValueError(f"Arrival time must not be negative for process {process_id}")
+        if process_id in process_ids:
+            raise ValueError(f"Duplicate process ID {process_id}")
+        process_ids.add(process_id)
+        processes.append(Process(process_id, bursts[0], arrival_time, list(zip(bursts[1::2], bursts[2::2]))))
+    return processes
+
+def write_results(output_dir, gantt_events, metrics):
+    """Write the Gantt events and per-process metrics as CSV, and all metrics as JSON."""
+    with open(os.path.join(output_dir, 'gantt.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        header = ['process_id', 'start_time', 'end_time', 'queue_priority']
+        if gantt_events and len(gantt_events[0]) > len(header):
+            header.append('core')  # Multi-core runs
+        writer.writerow(header)
+        writer.writerows(gantt_events)
+    metrics.write_csv(os.path.join(output_dir, 'processes.csv'))
+    metrics.write_json(os.path.join(output_dir, 'metrics.json'))
+
+def render_animation(trace, processes, args):
+    # Matplotlib is only needed when frames are actually rendered
+    if args.workers > 1:
+        from .services.parallel_visualizer_service import ParallelVisualizerService
+        visualizer = ParallelVisualizerService(output_dir=args.output, max_workers=args.workers,
+                                               save_frames=args.save_frames)
+    else:
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+        from .services.visualizer_service import VisualizerService
+        figure = Figure(figsize=(6, 4), dpi=100)
+        gantt_figure = Figure(figsize=(10, 2), dpi=100)
+        visualizer = VisualizerService(FigureCanvasAgg(figure), figure,
+                                       FigureCanvasAgg(gantt_figure), gantt_figure,
+                                       output_dir=args.output, save_frames=args.save_frames)
+    visualizer.assign_colors(processes)
+    TraceRenderer(trace, visualizer, len(args.quantum), start_time=args.frame_start,
+                  end_time=args.frame_end, step=args.frame_step).render()
+    visualizer.create_animation()
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m mlfq-simulator.cli',
+                                     description='Run the MLFQ scheduler headless.')
+    parser.add_argument('processes', nargs='?', help='CSV or JSON file with the process definitions')
+    parser.add_argument('--quantum', type=int, nargs='+',
+                        help='time quantum per queue, highest priority first (default: 2 4 8, or the snapshot\'s)')
+    parser.add_argument('--threshold', type=int,
+                        help='waiting time before a process is promoted (default: 8, or the snapshot\'s)')
+    parser.add_argument('--output', default='result', help='output directory (default: result)')
+    parser.add_argument('--log', choices=LOG_LEVELS, default='summary',
+                        help='console output: nothing, the metrics summary, or also a queue dump per event (default: summary)')
+    parser.add_argument('--log-file', help='write the log as JSON lines to this file instead of the console')
+    parser.add_argument('--trace', action='store_true', help='save the scheduling trace as trace.bin')
+    parser.add_argument('--animation', action='store_true', help='render the queue and Gantt animations')
+    parser.add_argument('--frame-start', type=int, default=0, help='first time unit to render')
+    parser.add_argument('--frame-end', type=int, default=None, help='last time unit to render')
+    parser.add_argument('--frame-step', type=int, default=1, help='time units between rendered frames')
+    parser.add_argument('--save-frames', action='store_true', help='also write every frame as PNG')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='render frames, or run sweep configurations, in this many processes')
+    parser.add_argument('--sweep-quantum', nargs='+', metavar='QUANTA',
+                        help='sweep these quantum lists, each quoted, e.g. "2 4 8" "1 2 4"')
+    parser.add_argument('--sweep-threshold', type=int, nargs='+', metavar='THRESHOLD',
+                        help='sweep these promotion thresholds')
+    parser.add_argument('--generate', type=int, metavar='COUNT',
+                        help='simulate COUNT synthetic processes instead of reading a file')
+    parser.add_argument('--arrival-rate', type=float, default=0.1,
+                        help='Poisson arrivals per time unit for --generate (default: 0.1)')
+    parser.add_argument('--burst-distribution', choices=['exponential', 'bimodal'], default='exponential',
+                        help='burst times for --generate (default: exponential)')
+    parser.add_argument('--mean-burst', type=float, default=10,
+                        help='mean exponential burst time for --generate (default: 10)')
+    parser.add_argument('--seed', type=int, help='random seed for --generate')
+    parser.add_argument('--cores', type=int, default=1, help='number of simulated CPUs (default: 1)')
+    parser.add_argument('--balancing', choices=BALANCING_POLICIES, default='steal',
+                        help='load balancing between cores (default: steal)')
+    parser.add_argument('--migration-interval', type=int, default=10,
+                        help='time units between rebalancing passes with --balancing migrate (default: 10)')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='save a snapshot of the run to FILE every --checkpoint-every time units')
+    parser.add_argument('--checkpoint-every', type=int, default=10000,
+                        help='time units between snapshots (default: 10000)')
+    parser.add_argument('--resume', metavar='FILE',
+                        help='continue the run saved in this snapshot instead of reading a process file')
+    return parser
+
+def make_logger(args):
+    return QueueLogger(args.log, JsonlSink(args.log_file) if args.log_file else None)
+
+def run_checkpointed(scheduler, args, history=None):
+    """
+    Run the scheduler to the end, checkpointing it to args.checkpoint every
+    args.checkpoint_every time units. history continues the log of a resumed checkpoint.
+    """
+    if not args.checkpoint:
+        return scheduler.run()
+    writer = CheckpointWriter(args.checkpoint, history)
+    while not scheduler.finished:
+        scheduler.run(until=(scheduler.current_time // args.checkpoint_every + 1) * args.checkpoint_every)
+        if not scheduler.finished:
+            writer.save(scheduler)
+    return scheduler.gantt_events
+
+def run_scheduler(workload, args, metrics, trace=None, record_gantt=True):
+    """Run the event-driven scheduler, on args.cores simulated CPUs, and return its Gantt events."""
+    logger = make_logger(args)
+    if args.cores == 1:
+        scheduler = EventDrivenMLFQ(workload, args.quantum, args.threshold, num_queues=len(args.quantum), trace=trace,
+                                    metrics=metrics, logger=logger, record_gantt=record_gantt)
+        return run_checkpointed(scheduler, args)
+    gantt_events = SMPMLFQ(workload, args.quantum, args.threshold, num_cores=args.cores,
+                           num_queues=len(args.quantum), balancing=args.balancing,
+                           migration_interval=args.migration_interval, metrics=metrics,
+                           record_gantt=record_gantt).run()
+    logger.log_summary(metrics)
+    logger.close()
+    return gantt_events
+
+def run_generated(args):
+    """Simulate a lazily generated workload, keeping only aggregate metrics in memory."""
+    workload = generate_workload(args.generate, arrival_rate=args.arrival_rate,
+                                 burst_distribution=args.burst_distribution,
+                                 mean_burst=args.mean_burst, seed=args.seed)
+    metrics = MetricsCollector(len(args.quantum), keep_processes=False, num_cores=args.cores)
+    run_scheduler(workload, args, metrics, record_gantt=False)
+    with open(os.path.join(args.output, 'metrics.json'), 'w') as f:
+        json.dump({'summary': metrics.summary()}, f, indent=2)
+    print(f"Results in {args.output}")
+    return 0
+
+def run_resumed(args, parser):
+    """Continue a run from the snapshot in args.resume, with other quanta or threshold if given."""
+    try:
+        state, history = load_checkpoint(args.resume)
+        scheduler = EventDrivenMLFQ.from_snapshot(state, logger=make_logger(args), time_quantum=args.quantum,
+                                                  promotion_threshold=args.threshold)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if scheduler.metrics is None:
+        parser.error(f"{args.resume} has no metrics to continue")
+    gantt_events = run_checkpointed(scheduler, args, history)
+    write_results(args.output, gantt_events, scheduler.metrics)
+    print(f"Results in {args.output}")
+    return 0
+
+def run_sweep_mode(processes, args, parser):
+    try:
+        quanta = [[int(q) for q in value.split()] for value in args.sweep_quantum or []]
+    except ValueError:
+        parser.error("--sweep-quantum values must be space-separated integers")
+    if any(not values or min(values) <= 0 for values in quanta):
+        parser.error("--sweep-quantum values must be positive")
+    if args.sweep_threshold and min(args.sweep_threshold) < 0:
+        parser.error("--sweep-threshold values must not be negative")
+    configs = sweep_grid(quanta or [args.quantum], args.sweep_threshold or [args.threshold],
+                         [os.path.basename(args.processes)])
+    workloads = {os.path.basename(args.processes): [(p.process_id, p.burst_time, p.arrival_time, p.io_bursts)
+                                                    for p in processes]}
+    rows = run_sweep(configs, workloads, max_workers=args.workers)
+    path = os.path.join(args.output, 'sweep.csv')
+    write_sweep_results(rows, path)
+    print(f"Ran {len(rows)} configurations, results in {path}")
+    return 0
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cores < 1 or args.migration_interval < 1 or args.checkpoint_every < 1:
+        parser.error("--cores, --migration-interval and --checkpoint-every must be positive")
+    # A zero quantum or frame step never advances time
+    if args.quantum is not None and min(args.quantum) <= 0:
+        parser.error("--quantum values must be positive")
+    if args.threshold is not None and args.threshold < 0:
+        parser.error("--threshold must not be negative")
+    if args.frame_step <= 0:
+        parser.error("--frame-step must be positive")
+    if args.frame_end is not None and args.frame_start > args.frame_end:
+        parser.error("--frame-start must not be after --frame-end")
+    if (args.checkpoint or args.resume) and (args.cores > 1 or args.generate is not None
+                                             or args.sweep_quantum or args.sweep_threshold):
+        parser.error("--checkpoint and --resume only work for single-core runs of a process file")
+    if args.resume:
+        if args.processes or args.trace or args.animation:
+            parser.error("--resume can't be combined with a process file, --trace or --animation")
+        os.makedirs(args.output, exist_ok=True)
+        return run_resumed(args, parser)
+    args.quantum = args.quantum or DEFAULT_QUANTUM
+    args.threshold = DEFAULT_THRESHOLD if args.threshold is None else args.threshold
+    if args.cores > 1 and (args.trace or args.animation or args.log == 'per-tick'
+                           or args.sweep_quantum or args.sweep_threshold):
+        parser.error("--trace, --animation, --log per-tick and sweeps run on one core only")
+    if (args.sweep_quantum or args.sweep_threshold) and (args.trace or args.animation):
+        parser.error("--trace and --animation can't be combined with a sweep")
+    if args.generate is not None:
+        if args.processes or args.sweep_quantum or args.sweep_threshold or args.trace or args.animation:
+            parser.error("--generate can't be combined with a process file, a sweep, --trace or --animation")
+        if args.generate <= 0 or args.arrival_rate <= 0 or args.mean_burst <= 0:
+            parser.error("--generate, --arrival-rate and --mean-burst must be positive")
+        os.makedirs(args.output, exist_ok=True)
+        return run_generated(args)
+    if not args.processes:
+        parser.error("a process file or --generate is required")
+    try:
+        processes = load_processes(args.processes)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    if not processes:
+        parser.error(f"No processes found in {args.processes}")
+    os.makedirs(args.output, exist_ok=True)
+    if args.sweep_quantum or args.sweep_threshold:
+        return run_sweep_mode(processes, args, parser)
+
+    trace = TraceRecorder() if args.trace or args.animation else None
+    metrics = MetricsCollector(len(args.quantum), num_cores=args.cores)
+    gantt_events = run_scheduler(processes, args, metrics, trace=trace)
+    write_results(args.output, gantt_events, metrics)
+    print(f"Results in {args.output}")
+
+    if args.trace:
+        trace.save(os.path.join(args.output, 'trace.bin'))
+    if args.animation:
+        render_animation(trace, processes, args)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
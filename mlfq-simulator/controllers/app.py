@@ -1,8 +1,10 @@
+import sys
 import threading
-from ..views import Menu
 from ..models import Process
+from ..services.clock_service import RealtimeClock, StepClock, make_clock
+from ..services.gui_thread_service import GuiThreadProxy
 from ..services.mlfq_scheduler import MLFQ
-from ..services.visualizer_service import VisualizerService
+from ..services.profiler_service import PhaseProfiler
 
 class App:
     """
@@ -10,6 +12,8 @@ class App:
     maintains the list of processes, and initiates the scheduling service.
     """
     def __init__(self, root):
+        # Tk and matplotlib are only imported once the GUI is actually built
+        from ..views import Menu
         self.root = root
         self.setup_ui = Menu(root, self)
         self.visualizer = None  # Will be initialized later
@@ -17,11 +21,19 @@ class App:
         self.processes = []
         self.time_quantum = [2, 4, 8]
         self.promotion_threshold = 8
+        self.clock = None  # Clock of the running simulation
+        self.scheduler = None
+        self.cancelled = None  # Set to stop the running simulation
+        self.profiling = False
 
     def add_process(self, process_id, burst_time):
-        new_process = Process(process_id, burst_time)
-        self.original_processes.append(new_process)  # Store original
-        self.processes.append(new_process)           # Working copy
+        return self.add_processes([(process_id, burst_time)])
+
+    def add_processes(self, processes):
+        """Add a batch of (process_id, burst_time) definitions at once."""
+        new_processes = [Process(process_id, burst_time) for process_id, burst_time in processes]
+        self.original_processes.extend(new_processes)  # Store original
+        self.processes.extend(new_processes)           # Working copy
         return True
 
     def update_process(self, process_id, burst_time=None):
@@ -33,28 +45,83 @@ class App:
         return False
 
     def remove_process(self, process_id):
-        self.original_processes = [process for process in self.original_processes if process.process_id != process_id]
-        self.processes = [process for process in self.processes if process.process_id != process_id]
+        return self.remove_processes([process_id])
+
+    def remove_processes(self, process_ids):
+        process_ids = set(process_ids)
+        self.original_processes = [process for process in self.original_processes if process.process_id not in process_ids]
+        self.processes = [process for process in self.processes if process.process_id not in process_ids]
         return True
 
-    def start_simulation(self):
+    def start_simulation(self, clock_mode='realtime', speed=1.0):
         # Reset processes from original definitions
         self.processes = [Process(p.process_id, p.burst_time)
                          for p in self.original_processes]
+        self.cancel_simulation()
+        self.clock = make_clock(clock_mode, speed)
+        clock = self.clock
+        self.cancelled = cancelled = threading.Event()
+
+        from ..services.visualizer_service import VisualizerService
 
         def run_scheduler():
-            self.visualizer = VisualizerService(
+            # The scheduler runs in this worker thread; its drawing is done in the Tk thread
+            self.visualizer = GuiThreadProxy(VisualizerService(
                 canvas=self.setup_ui.canvas,
                 figure=self.setup_ui.figure,
                 gantt_canvas=self.setup_ui.gantt_canvas,
                 gantt_figure=self.setup_ui.gantt_figure
-            )
+            ), self.root)
             scheduler_service = MLFQ(
                 root=self.root,
                 processes=self.processes.copy(),
                 time_quantum=self.time_quantum,
                 promotion_threshold=self.promotion_threshold,
-                visualizer=self.visualizer
+                visualizer=self.visualizer,
+                clock=clock,
+                profiler=self.make_profiler()
             )
+            self.scheduler = scheduler_service
+            # Checked after publishing the scheduler, so a cancel in between is never missed
+            if cancelled.is_set():
+                scheduler_service.cancel()
             scheduler_service.run()
-        threading.Thread(target=run_scheduler).start()
+        # A daemon thread doesn't keep the program alive once the window is closed
+        threading.Thread(target=run_scheduler, daemon=True).start()
+
+    def cancel_simulation(self):
+        """
+        Stop the running simulation, so that it draws nothing more into the
+        figures or result files a new run is about to use.
+        """
+        if self.cancelled is not None:
+            self.cancelled.set()
+        if self.scheduler is not None:
+            self.scheduler.cancel()
+        if self.clock is not None:
+            self.clock.close()  # Releases a step-mode run waiting for a step
+
+    def set_speed(self, speed):
+        """Change the speed of a real-time run while it is in progress."""
+        if isinstance(self.clock, RealtimeClock):
+            self.clock.set_speed(speed)
+
+    def make_profiler(self):
+        return PhaseProfiler(sys.stdout, count_allocations=True) if self.profiling else None
+
+    def set_profiling(self, enabled):
+        """Time the phases of the scheduler loop, from now on in a running simulation too."""
+        self.profiling = enabled
+        scheduler = self.scheduler
+        if scheduler is None or scheduler.finished or (scheduler.profiler is not None) == enabled:
+            return
+        profiler = scheduler.profiler
+        scheduler.profiler = self.make_profiler()
+        if profiler is not None:
+            # Switched off mid-run: report what was measured so far
+            profiler.end_run(scheduler.current_time)
+
+    def step(self, count=1):
+        """Advance a step-mode run by count time units."""
+        if isinstance(self.clock, StepClock):
+            self.clock.step(count)
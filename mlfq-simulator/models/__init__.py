@@ -1,2 +1,4 @@
 from .process import Process
-from .queue import Queue
\ No newline at end of file
+from .queue import Queue
+from .promotion_index import PromotionIndex
+from .blocked_set import BlockedSet
\ No newline at end of file
@@ -0,0 +1,29 @@
+import heapq
+import itertools
+
+class BlockedSet:
+    """
+    Processes blocked on I/O, in a min-heap keyed by wake-up time, so waking
+    the due processes only touches those processes however many are blocked.
+    Processes that wake at the same time leave in the order they blocked.
+    """
+    def __init__(self):
+        self.heap = []  # (wake_time, seq, queue_priority, process)
+        self.counter = itertools.count()
+
+    def block(self, process, priority, wake_time):
+        heapq.heappush(self.heap, (wake_time, next(self.counter), priority, process))
+
+    def next_wake_time(self):
+        return self.heap[0][0] if self.heap else None
+
+    def pop_woken(self, current_time):
+        """Remove every process due by current_time and return them as (process, queue_priority) pairs."""
+        woken = []
+        while self.heap and self.heap[0][0] <= current_time:
+            _, _, priority, process = heapq.heappop(self.heap)
+            woken.append((process, priority))
+        return woken
+
+    def __len__(self):
+        return len(self.heap)
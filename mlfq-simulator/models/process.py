@@ -1,7 +1,14 @@
 class Process:
-    def __init__(self, process_id, burst_time):
+    # Slots keep per-process overhead small for million-process workloads
+    __slots__ = ("process_id", "burst_time", "arrival_time", "io_bursts", "priority", "entry_time",
+                 "remaining_time_slice")
+
+    def __init__(self, process_id, burst_time, arrival_time=0, io_bursts=None):
         self.process_id = process_id
-        self.burst_time = burst_time
+        self.burst_time = burst_time  # Remaining time of the current CPU burst
+        self.arrival_time = arrival_time
+        # (io_time, cpu_time) pairs that follow the current CPU burst, in order
+        self.io_bursts = list(io_bursts) if io_bursts else None
         self.priority = 0
         self.entry_time = 0
         self.remaining_time_slice = None
\ No newline at end of file
@@ -0,0 +1,47 @@
+import heapq
+import itertools
+
+class PromotionIndex:
+    """
+    Min-heap of waiting processes keyed by the time they entered their queue.
+    With a fixed promotion threshold the heap top is always the next process
+    to become due, so a promotion check only looks at processes that are
+    actually promoted. Entries of processes that left their queue are marked
+    removed and dropped lazily when they reach the top.
+    """
+    def __init__(self):
+        self.heap = []      # [entry_time, seq, queue_priority, process]
+        self.entries = {}   # process -> its live heap entry
+        self.counter = itertools.count()
+
+    def push(self, process, priority, entry_time):
+        self.discard(process)
+        entry = [entry_time, next(self.counter), priority, process]
+        self.entries[process] = entry
+        heapq.heappush(self.heap, entry)
+
+    def discard(self, process):
+        entry = self.entries.pop(process, None)
+        if entry is not None:
+            entry[-1] = None
+
+    def peek(self):
+        """Entry time of the longest waiting process, or None if nothing is indexed."""
+        while self.heap and self.heap[0][-1] is None:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def pop_due(self, cutoff):
+        """
+        Remove every process that entered its queue at or before cutoff and
+        return them as (process, queue_priority) pairs, ordered by queue and
+        then FIFO position, i.e. the order a scan of the queues would visit them.
+        """
+        due = []
+        while self.heap and self.heap[0][0] <= cutoff:
+            entry = heapq.heappop(self.heap)
+            if entry[-1] is not None:
+                del self.entries[entry[-1]]
+                due.append(entry)
+        due.sort(key=lambda entry: (entry[2], entry[1]))
+        return [(entry[3], entry[2]) for entry in due]
@@ -1,17 +1,58 @@
+from collections import OrderedDict
 from .process import Process
 
 class Queue:
-    def __init__(self, priority):
+    def __init__(self, priority, promotion_index=None):
         self.priority = priority
-        self.processes = []
+        # Insertion-ordered dict used as a linked FIFO keyed by process: both
+        # ends and removal of any process by handle are O(1)
+        self.entries = OrderedDict()
+        self.promotion_index = promotion_index
+
+    @property
+    def processes(self):
+        """Snapshot of the queued processes, head first."""
+        return list(self.entries)
 
     def enqueue(self, process:Process, current_time):
         process.priority = self.priority
         process.entry_time = current_time
-        self.processes.append(process)
+        self.entries[process] = None
+        if self.promotion_index is not None:
+            self.promotion_index.push(process, self.priority, current_time)
 
     def dequeue(self):
-        return self.processes.pop(0) if self.processes else None
+        if not self.entries:
+            return None
+        process, _ = self.entries.popitem(last=False)
+        if self.promotion_index is not None:
+            self.promotion_index.discard(process)
+        return process
+
+    def pop_back(self):
+        """Remove and return the most recently queued process, e.g. to migrate it to another queue."""
+        if not self.entries:
+            return None
+        process, _ = self.entries.popitem(last=True)
+        if self.promotion_index is not None:
+            self.promotion_index.discard(process)
+        return process
+
+    def push_front(self, process:Process):
+        """Put a process at the head without touching its entry time or promotion deadline."""
+        self.entries[process] = None
+        self.entries.move_to_end(process, last=False)
+
+    def remove(self, process:Process):
+        del self.entries[process]
+        if self.promotion_index is not None:
+            self.promotion_index.discard(process)
 
     def is_empty(self):
-        return len(self.processes) == 0
\ No newline at end of file
+        return not self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __iter__(self):
+        return iter(self.entries)
\ No newline at end of file
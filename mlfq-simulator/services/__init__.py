@@ -1,3 +1,24 @@
 from .mlfq_scheduler import MLFQ
+from .event_scheduler import EventDrivenMLFQ
+from .smp_scheduler import SMPMLFQ
 from .queue_service import QueueService
-from .visualizer_service import VisualizerService
\ No newline at end of file
+from .metrics_service import MetricsCollector
+
+# These need NumPy, matplotlib or imageio, which take far longer to import than
+# the schedulers, so they are only imported on first use
+_LAZY = {
+    'VectorizedMLFQ': '.vector_scheduler',
+    'VisualizerService': '.visualizer_service',
+    'ParallelVisualizerService': '.parallel_visualizer_service',
+}
+
+def __getattr__(name):
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib import import_module
+    value = getattr(import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + list(_LAZY))
@@ -0,0 +1,90 @@
+import io
+import struct
+import imageio.v2 as imageio
+import numpy as np
+from PIL import Image
+
+def encode_gif_frame(frame, delay):
+    """
+    Encode one RGB(A) frame as a self-contained GIF frame block: a graphic
+    control extension with the delay (in 1/100 s), the image descriptor and a
+    local palette, followed by the LZW data. Blocks can be produced in any
+    process and concatenated by AnimationWriter.append_encoded.
+    """
+    image = Image.fromarray(np.ascontiguousarray(frame[..., :3])).quantize(
+        colors=256, method=Image.Quantize.FASTOCTREE)
+    buffer = io.BytesIO()
+    image.save(buffer, format='GIF')
+    data = buffer.getvalue()
+
+    # Single-frame layout: header (6), screen descriptor (7), global palette, blocks, trailer
+    flags = data[10]
+    palette_size = 3 << ((flags & 7) + 1) if flags & 0x80 else 0
+    palette = data[13:13 + palette_size]
+    blocks = data[13 + palette_size:-1]
+
+    # Skip any extensions Pillow wrote; ours carries the delay instead
+    i = 0
+    while blocks[i] == 0x21:
+        i += 2
+        while blocks[i]:
+            i += blocks[i] + 1
+        i += 1
+    descriptor = blocks[i:i + 10]
+    image_data = blocks[i + 10:]
+    if palette and not descriptor[9] & 0x80:
+        # Move the global palette into the frame so every frame stands alone
+        descriptor = descriptor[:9] + bytes([descriptor[9] | 0x80 | (flags & 7)])
+        image_data = palette + image_data
+
+    control = b'\x21\xf9\x04\x00' + struct.pack('<H', delay) + b'\x00\x00'
+    return control + descriptor + image_data
+
+
+class AnimationWriter:
+    """
+    Streams rendered frames into an animation file. Frames are encoded and
+    written as they arrive, so memory stays flat however long the run is.
+    GIFs are encoded here one frame at a time; other formats (e.g. .mp4 with
+    imageio-ffmpeg installed) go through imageio's streaming writers.
+    """
+    def __init__(self, path, fps=1):
+        self.path = path
+        self.fps = fps
+        self.delay = max(1, round(100 / fps))  # GIF delays are in 1/100 s
+        self.is_gif = path.lower().endswith('.gif')
+        self.file = None
+        self.writer = None
+        self.frame_count = 0
+
+    def append(self, frame):
+        """Append an RGB or RGBA array, e.g. np.asarray(canvas.buffer_rgba())."""
+        frame = np.asarray(frame)
+        if self.is_gif:
+            self.append_encoded(encode_gif_frame(frame, self.delay), frame.shape[1], frame.shape[0])
+            return
+        if self.writer is None:
+            self.writer = imageio.get_writer(self.path, fps=self.fps)
+        self.writer.append_data(frame[..., :3])
+        self.frame_count += 1
+
+    def append_encoded(self, block, width, height):
+        """Append a frame block produced by encode_gif_frame."""
+        if self.file is None:
+            self.file = open(self.path, 'wb')
+            # Header, screen descriptor without a global palette, and loop forever
+            self.file.write(b'GIF89a' + struct.pack('<HHBBB', width, height, 0x70, 0, 0))
+            self.file.write(b'\x21\xff\x0bNETSCAPE2.0\x03\x01\x00\x00\x00')
+        self.file.write(block)
+        self.frame_count += 1
+
+    def close(self):
+        """Finish the file and return the number of frames written."""
+        if self.file is not None:
+            self.file.write(b'\x3b')
+            self.file.close()
+            self.file = None
+        if self.writer is not None:
+            self.writer.close()
+            self.writer = None
+        return self.frame_count
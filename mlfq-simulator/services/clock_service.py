@@ -0,0 +1,85 @@
+import threading
+import time
+
+CLOCK_MODES = ('realtime', 'max', 'step')
+MIN_SPEED, MAX_SPEED = 0.1, 100
+
+class MaxSpeedClock:
+    """Simulated time advances as fast as the scheduler can go."""
+    def tick(self, current_time):
+        pass
+
+    def close(self):
+        pass
+
+
+class RealtimeClock:
+    """
+    One simulated time unit takes tick_seconds / speed of wall time. The
+    speed can be changed while a run is in progress, from any thread, and
+    applies from the next tick on. Ticks are paced against deadlines, so time
+    spent drawing counts towards the delay instead of adding to it.
+    """
+    def __init__(self, speed=1.0, tick_seconds=0.5):
+        self.tick_seconds = tick_seconds
+        self.set_speed(speed)
+        self.deadline = None
+
+    def set_speed(self, speed):
+        if not MIN_SPEED <= speed <= MAX_SPEED:
+            raise ValueError(f"Speed must be between {MIN_SPEED}x and {MAX_SPEED}x")
+        self.speed = speed
+
+    def tick(self, current_time):
+        now = time.monotonic()
+        if self.deadline is None:
+            self.deadline = now
+        self.deadline += self.tick_seconds / self.speed
+        delay = self.deadline - now
+        if delay > 0:
+            time.sleep(delay)
+        else:
+            # Running behind, e.g. on a slow frame; don't rush the next ticks to catch up
+            self.deadline = now
+
+    def close(self):
+        pass
+
+
+class StepClock:
+    """
+    Simulated time only advances when step() is called, e.g. from a button
+    in the Tk thread. close() releases a waiting run, which then finishes
+    without waiting.
+    """
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.pending = 0
+        self.closed = False
+
+    def step(self, count=1):
+        with self.condition:
+            self.pending += count
+            self.condition.notify_all()
+
+    def tick(self, current_time):
+        with self.condition:
+            self.condition.wait_for(lambda: self.pending or self.closed)
+            if self.pending:
+                self.pending -= 1
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+def make_clock(mode, speed=1.0):
+    """The clock for one of CLOCK_MODES; speed only applies to 'realtime'."""
+    if mode == 'realtime':
+        return RealtimeClock(speed)
+    if mode == 'max':
+        return MaxSpeedClock()
+    if mode == 'step':
+        return StepClock()
+    raise ValueError(f"Unknown clock mode {mode!r}, expected one of {', '.join(CLOCK_MODES)}")
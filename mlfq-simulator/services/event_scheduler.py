@@ -0,0 +1,157 @@
+from ..models.queue import Queue
+from .metrics_service import MetricsCollector
+from .queue_service import QueueService
+from .snapshot_service import read_snapshot, restore_snapshot, take_snapshot
+from .trace_service import DISPATCH, STOP
+from .workload_service import ArrivalStream
+
+def next_event_time(*times):
+    """The earliest of the given event times, ignoring None; None if there are none."""
+    next_time = None
+    for t in times:
+        if t is not None and (next_time is None or t < next_time):
+            next_time = t
+    return next_time
+
+class EventDrivenMLFQ:
+    """
+    Headless MLFQ engine. Instead of stepping one time unit at a time like
+    MLFQ.run, it jumps straight to the next event (time slice expiry,
+    completion, arrival, I/O wake-up or promotion deadline) and only touches
+    the queues then. The scheduling decisions, and therefore the Gantt
+    events, are the same.
+    Pass a TraceRecorder to keep a replayable record of the run, a
+    MetricsCollector to gather scheduling metrics and a QueueLogger to log
+    them (at 'per-tick' it dumps the queues after every event).
+
+    processes may be any iterable in arrival order, including a generator;
+    it is consumed lazily as simulated time reaches each arrival. For very
+    long runs, record_gantt=False keeps the Gantt events out of memory.
+    """
+    def __init__(self, processes, time_quantum, promotion_threshold, num_queues=3,
+                 trace=None, metrics=None, logger=None, record_gantt=True):
+        self.processes = processes
+        self.queues = [Queue(i) for i in range(num_queues)]
+        self.trace = trace
+        self.metrics = metrics
+        self.logger = logger
+        self.queue_service = QueueService(self.queues, trace=trace, metrics=metrics)
+        self.time_quantum = time_quantum
+        self.promotion_threshold = promotion_threshold
+        self.record_gantt = record_gantt
+        self.gantt_events = []  # (process_id, start_time, end_time, queue_priority)
+        # Run state, kept here so that a run can stop and continue, or be snapshotted
+        self.arrivals = None
+        self.current_time = 0
+        self.finished = False
+
+    @classmethod
+    def from_snapshot(cls, data, trace=None, logger=None, record_gantt=True,
+                      time_quantum=None, promotion_threshold=None):
+        """
+        A scheduler that continues the run a snapshot was taken from, with the
+        same quanta and threshold unless others are given (e.g. to branch off a
+        what-if run). Metrics are restored if the snapshot has them. data is
+        the snapshot's bytes or the state load_checkpoint read from a checkpoint.
+        """
+        state = read_snapshot(data) if isinstance(data, (bytes, bytearray)) else data
+        if state['running'] is not None:
+            raise ValueError("The snapshot was taken in the middle of a time slice; restore it with MLFQ")
+        metrics = MetricsCollector(state['num_queues']) if state['metrics'] is not None else None
+        scheduler = cls([], time_quantum or state['time_quantum'],
+                        state['promotion_threshold'] if promotion_threshold is None else promotion_threshold,
+                        num_queues=state['num_queues'], trace=trace, metrics=metrics, logger=logger,
+                        record_gantt=record_gantt)
+        restore_snapshot(scheduler, state)
+        return scheduler
+
+    def snapshot(self):
+        """The state of a run stopped by run(until), as bytes for from_snapshot."""
+        return take_snapshot(self)
+
+    def run(self, until=None):
+        """
+        Run the simulation to the end, or only up to time until. Calling run
+        again continues where it stopped, e.g. after taking a snapshot.
+        """
+        if self.finished:
+            return self.gantt_events
+        if self.arrivals is None:
+            self.arrivals = ArrivalStream(self.processes)
+        arrivals = self.arrivals
+        current_time = self.current_time
+        while True:
+            if until is not None and current_time >= until:
+                self.current_time = current_time
+                return self.gantt_events
+            self.queue_service.admit_arrivals(arrivals, current_time)
+            self.queue_service.wake_processes(current_time)
+            self.queue_service.promote_processes(current_time, self.promotion_threshold)
+
+            running_queue_idx = next(
+                (i for i, queue in enumerate(self.queues) if not queue.is_empty()), None)
+            if running_queue_idx is None:
+                current_time = next_event_time(arrivals.next_arrival_time(),
+                                               self.queue_service.next_wake_time())
+                if current_time is None:
+                    break
+                # The CPU idles until the next process arrives or wakes up
+                continue
+            running_process = self.queues[running_queue_idx].dequeue()
+
+            # Without preemption the process keeps the CPU until its slice
+            # expires or it finishes, so the whole run is a single event
+            time_slice = self.time_quantum[running_queue_idx]
+            if self.trace is not None:
+                self.trace.record(DISPATCH, current_time, running_process.process_id,
+                                  running_queue_idx, time_slice)
+            if self.metrics is not None:
+                self.metrics.on_dispatch(running_process.process_id, current_time)
+            run_time = min(running_process.burst_time, time_slice)
+            end_time = current_time + run_time
+
+            # Waiting processes still age, and others arrive or wake up, while it runs
+            self._advance(arrivals, current_time + 1, end_time)
+
+            running_process.burst_time -= run_time
+            running_process.remaining_time_slice = time_slice - run_time
+            running_process.entry_time = end_time
+            if self.trace is not None:
+                self.trace.record(STOP, end_time, running_process.process_id,
+                                  running_queue_idx, running_process.burst_time)
+            finished = running_process.burst_time == 0 and not running_process.io_bursts
+            if self.metrics is not None:
+                self.metrics.on_stop(running_process.process_id, current_time, end_time, finished)
+            if self.record_gantt:
+                self.gantt_events.append(
+                    (running_process.process_id, current_time, end_time, running_queue_idx))
+            if running_process.burst_time > 0:
+                self.queue_service.demote_process(running_process, end_time, running_queue_idx)
+            elif not finished:
+                self.queue_service.block_process(running_process, end_time, running_queue_idx)
+            current_time = end_time
+            if self.logger is not None:
+                self.logger.log_queues(self.queues, current_time)
+
+        self.finished = True
+        if self.logger is not None:
+            if self.metrics is not None:
+                self.logger.log_summary(self.metrics)
+            self.logger.close()
+        return self.gantt_events
+
+    def _advance(self, arrivals, start_time, end_time):
+        """Apply the arrivals, wake-ups and promotions the per-tick loop would do at start_time .. end_time - 1."""
+        t = start_time
+        while True:
+            next_time = next_event_time(arrivals.next_arrival_time(), self.queue_service.next_wake_time(),
+                                        self.queue_service.next_promotion_time(self.promotion_threshold))
+            if next_time is None:
+                return
+            t = max(t, next_time)
+            if t >= end_time:
+                return
+            self.queue_service.admit_arrivals(arrivals, t)
+            self.queue_service.wake_processes(t)
+            self.queue_service.promote_processes(t, self.promotion_threshold)
+            t += 1
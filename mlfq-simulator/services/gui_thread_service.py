@@ -0,0 +1,40 @@
+import threading
+
+class GuiThreadProxy:
+    """
+    Wraps an object whose methods draw into Tk widgets, such as a
+    VisualizerService on FigureCanvasTkAgg canvases, for use from a worker
+    thread. Each method call is handed to the Tk main loop with root.after
+    and the worker waits for it to finish, so widgets are only touched from
+    the Tk thread and the data passed in can't change while it is drawn.
+    Calls made from the Tk thread itself run directly.
+    """
+    def __init__(self, target, root):
+        self._target = target
+        self._root = root
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute):
+            return attribute
+
+        def call(*args, **kwargs):
+            if threading.current_thread() is threading.main_thread():
+                return attribute(*args, **kwargs)
+            done = threading.Event()
+            outcome = {}
+
+            def run():
+                try:
+                    outcome['result'] = attribute(*args, **kwargs)
+                except BaseException as e:
+                    outcome['error'] = e
+                finally:
+                    done.set()
+
+            self._root.after(0, run)
+            done.wait()
+            if 'error' in outcome:
+                raise outcome['error']
+            return outcome.get('result')
+        return call
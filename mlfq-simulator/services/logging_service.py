@@ -0,0 +1,104 @@
+import json
+import sys
+
+LOG_LEVELS = ('off', 'summary', 'per-tick')
+
+def format_queues(queues, current_time):
+    """The console queue dump, one line per queue and per process."""
+    lines = [f"\nTime: {current_time}"]
+    for queue in queues:
+        priority_name = ["High", "Medium", "Low"][queue.priority] if queue.priority < 3 else f"Queue {queue.priority}"
+        lines.append(f"Queue {queue.priority} ({priority_name}):")
+        for p in queue:
+            wt = current_time - p.entry_time
+            rt = p.remaining_time_slice if p.remaining_time_slice is not None else "-"
+            lines.append(f"  Process P{p.process_id} | Remaining Burst: {p.burst_time} | Priority: {p.priority} | WT: {wt} | RT Slice: {rt}")
+    return '\n'.join(lines)
+
+
+class StdoutSink:
+    """Writes queue dumps as text, buffered and flushed every flush_every dumps in a single write."""
+    def __init__(self, stream=None, flush_every=100):
+        self.stream = stream or sys.stdout
+        self.flush_every = flush_every
+        self.buffer = []
+
+    def log_queues(self, queues, current_time):
+        self.buffer.append(format_queues(queues, current_time))
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def log_summary(self, metrics):
+        self.buffer.append(metrics.format_summary())
+        self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.stream.write('\n'.join(self.buffer) + '\n')
+            self.stream.flush()
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+
+
+class JsonlSink:
+    """
+    Writes one JSON object per line: a queue dump per logged tick, with
+    [process_id, burst_time, waiting_time, remaining_time_slice] per
+    process, and the metrics summary at the end. Lines are written in
+    batches of batch_size.
+    """
+    def __init__(self, path, batch_size=1000):
+        self.path = path
+        self.batch_size = batch_size
+        self.file = open(path, 'w')
+        self.buffer = []
+
+    def log_queues(self, queues, current_time):
+        self.buffer.append(json.dumps({
+            'time': current_time,
+            'queues': [[[p.process_id, p.burst_time, current_time - p.entry_time, p.remaining_time_slice]
+                        for p in queue] for queue in queues],
+        }))
+        if len(self.buffer) >= self.batch_size:
+            self.flush()
+
+    def log_summary(self, metrics):
+        self.buffer.append(json.dumps({'summary': metrics.summary()}))
+        self.flush()
+
+    def flush(self):
+        if self.buffer:
+            self.file.write('\n'.join(self.buffer) + '\n')
+            self.buffer = []
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+
+class QueueLogger:
+    """
+    Gates scheduler console output behind a level: 'off' logs nothing,
+    'summary' only the metrics at the end of a run and 'per-tick' also a
+    queue dump every tick. Output goes to a buffered sink (StdoutSink by
+    default, or JsonlSink for a machine-readable log).
+    """
+    def __init__(self, level='summary', sink=None):
+        if level not in LOG_LEVELS:
+            raise ValueError(f"Unknown log level {level!r}, expected one of {', '.join(LOG_LEVELS)}")
+        self.level = level
+        self.sink = sink if sink is not None else StdoutSink()
+        self.per_tick = level == 'per-tick'
+
+    def log_queues(self, queues, current_time):
+        if self.per_tick:
+            self.sink.log_queues(queues, current_time)
+
+    def log_summary(self, metrics):
+        if self.level != 'off':
+            self.sink.log_summary(metrics)
+
+    def close(self):
+        self.sink.close()
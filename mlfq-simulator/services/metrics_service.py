@@ -0,0 +1,188 @@
+import csv
+import json
+from collections import Counter
+
+PROCESS_FIELDS = ['process_id', 'arrival_time', 'burst_time', 'io_time', 'first_run_time', 'completion_time',
+                  'turnaround_time', 'waiting_time', 'response_time', 'dispatches']
+
+class MetricsCollector:
+    """
+    Scheduling metrics fed by the scheduler as events happen: admissions,
+    dispatches, stops, I/O blocks and wake-ups, promotions and demotions. Every event does O(1) work
+    and the aggregates are kept as running totals, so summary() is cheap at
+    any point of the run. With keep_processes=False the records of completed
+    processes are dropped, so memory only grows with the processes in flight.
+    Multi-core runs pass num_cores and the core of each dispatch and stop.
+    """
+    def __init__(self, num_queues=3, keep_processes=True, num_cores=1):
+        self.keep_processes = keep_processes
+        self.num_cores = num_cores
+        self.processes = {}  # process_id -> per-process record
+        self.admitted = 0
+        self.promotions = [0] * num_queues  # Counted at the level a process leaves
+        self.demotions = [0] * num_queues
+        self.dispatches = 0
+        self.context_switches = 0
+        self.last_process_ids = [None] * num_cores  # Last process that ran on each core
+        self.core_busy_time = [0] * num_cores
+        self.migrations = 0
+        self.start_time = None
+        self.end_time = 0
+        self.completed = 0
+        self.total_turnaround = 0
+        self.total_waiting = 0
+        self.total_response = 0
+        self.max_turnaround = 0
+        # Turnaround times are integers, so a histogram gives exact percentiles in little memory
+        self.turnaround_counts = Counter()
+        self.io_blocks = 0
+        self.woken = {}  # process_id -> wake-up time, until it is dispatched again
+        self.total_wake_latency = 0
+        self.wake_dispatches = 0
+
+    def on_admit(self, process_id, burst_time, current_time, io_time=0):
+        """burst_time and io_time are the total CPU and I/O time the process needs."""
+        self.processes[process_id] = {
+            'process_id': process_id, 'arrival_time': current_time, 'burst_time': burst_time, 'io_time': io_time,
+            'first_run_time': None, 'completion_time': None, 'turnaround_time': None,
+            'waiting_time': None, 'response_time': None, 'dispatches': 0,
+        }
+        self.admitted += 1
+        if self.start_time is None or current_time < self.start_time:
+            self.start_time = current_time
+
+    def on_dispatch(self, process_id, current_time, core=0):
+        record = self.processes[process_id]
+        record['dispatches'] += 1
+        if record['first_run_time'] is None:
+            record['first_run_time'] = current_time
+            record['response_time'] = current_time - record['arrival_time']
+            self.total_response += record['response_time']
+        wake_time = self.woken.pop(process_id, None)
+        if wake_time is not None:
+            self.total_wake_latency += current_time - wake_time
+            self.wake_dispatches += 1
+        self.dispatches += 1
+        # Running the same process again right after its own slice needs no switch
+        if process_id != self.last_process_ids[core]:
+            self.context_switches += 1
+        self.last_process_ids[core] = process_id
+
+    def on_stop(self, process_id, start_time, end_time, finished, core=0):
+        self.core_busy_time[core] += end_time - start_time
+        self.end_time = max(self.end_time, end_time)
+        if finished:
+            record = self.processes[process_id]
+            record['completion_time'] = end_time
+            record['turnaround_time'] = end_time - record['arrival_time']
+            # Time spent ready in a queue, neither running nor blocked
+            record['waiting_time'] = record['turnaround_time'] - record['burst_time'] - record['io_time']
+            self.completed += 1
+            self.total_turnaround += record['turnaround_time']
+            self.total_waiting += record['waiting_time']
+            self.max_turnaround = max(self.max_turnaround, record['turnaround_time'])
+            self.turnaround_counts[record['turnaround_time']] += 1
+            if not self.keep_processes:
+                del self.processes[process_id]
+
+    def on_block(self, process_id, current_time):
+        self.io_blocks += 1
+
+    def on_wake(self, process_id, current_time):
+        self.woken[process_id] = current_time
+
+    def on_migrate(self, process_id, from_core, to_core):
+        self.migrations += 1
+
+    def on_promote(self, process_id, from_priority):
+        self.promotions[from_priority] += 1
+
+    def on_demote(self, process_id, from_priority, to_priority):
+        if to_priority != from_priority:
+            self.demotions[from_priority] += 1
+
+    def summary(self):
+        """Aggregate metrics over the processes seen so far; averages are over completed processes."""
+        completed = self.completed or 1
+        elapsed = self.end_time - (self.start_time or 0)
+        return {
+            'processes': self.admitted,
+            'completed': self.completed,
+            'makespan': self.end_time,
+            'avg_turnaround': self.total_turnaround / completed,
+            'avg_waiting': self.total_waiting / completed,
+            'avg_response': self.total_response / (self.admitted or 1),
+            'p50_turnaround': self.turnaround_percentile(50),
+            'p95_turnaround': self.turnaround_percentile(95),
+            'p99_turnaround': self.turnaround_percentile(99),
+            'max_turnaround': self.max_turnaround,
+            'dispatches': self.dispatches,
+            'context_switches': self.context_switches,
+            'promotions': list(self.promotions),
+            'demotions': list(self.demotions),
+            'io_blocks': self.io_blocks,
+            # How long woken processes wait for the CPU, the latency interactive jobs see
+            'avg_wake_latency': self.total_wake_latency / (self.wake_dispatches or 1),
+            'cpu_utilization': sum(self.core_busy_time) / (elapsed * self.num_cores) if elapsed else 0.0,
+            'core_utilization': [busy / elapsed if elapsed else 0.0 for busy in self.core_busy_time],
+            'migrations': self.migrations,
+            'throughput': self.completed / elapsed if elapsed else 0.0,
+        }
+
+    def turnaround_percentile(self, percentile):
+        """Smallest turnaround time that at least percentile % of the completed processes stay within."""
+        needed = self.completed * percentile / 100
+        seen = 0
+        for turnaround in sorted(self.turnaround_counts):
+            seen += self.turnaround_counts[turnaround]
+            if seen >= needed:
+                return turnaround
+        return 0
+
+    def format_summary(self):
+        s = self.summary()
+        lines = [
+            f"Completed {s['completed']}/{s['processes']} processes in {s['makespan']} time units",
+            f"  Avg turnaround: {s['avg_turnaround']:.2f} | Avg waiting: {s['avg_waiting']:.2f}"
+            f" | Avg response: {s['avg_response']:.2f}",
+            f"  Turnaround p50: {s['p50_turnaround']} | p95: {s['p95_turnaround']}"
+            f" | p99: {s['p99_turnaround']} | max: {s['max_turnaround']}",
+            f"  Context switches: {s['context_switches']} | Promotions per queue: {s['promotions']}"
+            f" | Demotions per queue: {s['demotions']}",
+        ]
+        if s['io_blocks']:
+            lines.append(f"  I/O blocks: {s['io_blocks']} | Avg wake-up latency: {s['avg_wake_latency']:.2f}")
+        lines.append(f"  CPU utilization: {s['cpu_utilization']:.1%} | Throughput: {s['throughput']:.3f} processes/unit")
+        if self.num_cores > 1:
+            cores = ' '.join(f"{u:.0%}" for u in s['core_utilization'])
+            lines.append(f"  Utilization per core: {cores} | Migrations: {s['migrations']}")
+        return '\n'.join(lines)
+
+    def get_state(self, process_ids=None):
+        """Everything collected so far as plain values, for snapshots; only the records of process_ids if given."""
+        state = dict(vars(self))
+        records = self.processes.values() if process_ids is None else (self.processes[pid] for pid in process_ids)
+        state['processes'] = [[record[field] for field in PROCESS_FIELDS] for record in records]
+        state['turnaround_counts'] = dict(self.turnaround_counts)
+        return state
+
+    def set_state(self, state):
+        """Continue from a state returned by get_state."""
+        vars(self).update(state)
+        self.processes = {row[0]: dict(zip(PROCESS_FIELDS, row)) for row in state['processes']}
+        self.turnaround_counts = Counter(state['turnaround_counts'])
+
+    def process_rows(self):
+        return list(self.processes.values())
+
+    def write_csv(self, path):
+        """Write the per-process metrics as CSV."""
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=PROCESS_FIELDS)
+            writer.writeheader()
+            writer.writerows(self.processes.values())
+
+    def write_json(self, path):
+        """Write the aggregate and per-process metrics as JSON."""
+        with open(path, 'w') as f:
+            json.dump({'summary': self.summary(), 'processes': self.process_rows()}, f, indent=2)
@@ -1,35 +1,112 @@
 from ..models.queue import Queue
+from .clock_service import RealtimeClock
+from .logging_service import QueueLogger, StdoutSink
+from .metrics_service import MetricsCollector
 from .queue_service import QueueService
-import time
+from .snapshot_service import read_snapshot, restore_snapshot, take_snapshot
+from .trace_service import TraceRecorder, TraceRenderer, DISPATCH, STOP
+from .event_scheduler import next_event_time
+from .workload_service import ArrivalStream
 
 class MLFQ:
     def __init__(self, root, processes, time_quantum, promotion_threshold,
-                 visualizer, num_queues=3):
+                 visualizer, num_queues=3, trace=None, metrics=None, logger=None, clock=None, profiler=None):
         self.root = root
         self.processes = processes
         self.queues = [Queue(i) for i in range(num_queues)]
-        self.queue_service = QueueService(self.queues)
+        # The scheduler only appends state changes to the trace; frames are
+        # replayed from it, and not at all when there is no visualizer
+        self.trace = trace if trace is not None else TraceRecorder()
+        self.metrics = metrics if metrics is not None else MetricsCollector(num_queues)
+        self.queue_service = QueueService(self.queues, trace=self.trace, metrics=self.metrics)
+        # The GUI keeps its per-tick console dump, written once per tick
+        self.logger = logger if logger is not None else QueueLogger('per-tick', StdoutSink(flush_every=1))
         self.visualizer = visualizer
+        self.renderer = TraceRenderer(self.trace, visualizer, num_queues) if visualizer else None
         self.time_quantum = time_quantum
         self.promotion_threshold = promotion_threshold
+        # Paces the ticks: real time at some speed, as fast as possible, or step by step
+        self.clock = clock if clock is not None else RealtimeClock()
+        # Times the phases of each tick; can be attached or removed while the run is in progress
+        self.profiler = profiler
+        self.gantt_events = []  # (process_id, start_time, end_time, queue_priority)
+        # Run state, kept here so that a run can stop and continue, or be snapshotted
+        self.arrivals = None
+        self.current_time = 0
+        self.running = None  # (process, queue_priority, start_time)
+        self.finished = False
+        self.cancelled = False
 
-    def run(self):
-        # Enqueue all processes in the highest priority queue (queue 0)
-        for p in self.processes:
-            self.queues[0].enqueue(p, 0)
+    @classmethod
+    def from_snapshot(cls, data, root, visualizer, trace=None, logger=None, clock=None,
+                      time_quantum=None, promotion_threshold=None):
+        """
+        A scheduler that continues the run a snapshot was taken from, with the
+        same quanta and threshold unless others are given (e.g. to branch off a
+        what-if run). To draw frames from the snapshot on, pass the run's trace.
+        data is the snapshot's bytes or the state load_checkpoint returned.
+        """
+        state = read_snapshot(data) if isinstance(data, (bytes, bytearray)) else data
+        if visualizer and not trace:
+            raise ValueError("Drawing a restored run needs the trace up to the snapshot")
+        scheduler = cls(root, [], time_quantum or state['time_quantum'],
+                        state['promotion_threshold'] if promotion_threshold is None else promotion_threshold,
+                        visualizer, num_queues=state['num_queues'], trace=trace, logger=logger, clock=clock)
+        processes = restore_snapshot(scheduler, state)
+        if visualizer:
+            scheduler.renderer = TraceRenderer(scheduler.trace, visualizer, state['num_queues'],
+                                               start_time=state['current_time'])
+            visualizer.assign_colors(sorted(processes, key=lambda p: p.process_id))
+        return scheduler
 
-        current_time = 0
-        self.queue_service.print_queues(current_time)
-        self.visualizer.assign_colors(self.processes)
-        self.visualizer.save_queue_image(self.queues, current_time)
+    def snapshot(self):
+        """The state of a run stopped by run(until), as bytes for from_snapshot."""
+        return take_snapshot(self)
 
-        running_process = None
-        running_queue_idx = None
-        gantt_start_time = None  # Track when the current process started running
+    def cancel(self):
+        """
+        Stop the run before its next tick, from any thread, without drawing
+        any more frames or writing the animations. A run waiting on its clock
+        stops once the clock ticks or is closed.
+        """
+        self.cancelled = True
 
-        while any(not q.is_empty() for q in self.queues) or running_process:
+    def run(self, until=None):
+        """
+        Run the simulation to the end, or only up to time until. Calling run
+        again continues where it stopped, e.g. after taking a snapshot.
+        """
+        if self.finished:
+            return self.gantt_events
+        current_time = self.current_time
+        if self.arrivals is None:
+            # Processes enter the highest priority queue (queue 0) as they arrive
+            self.arrivals = ArrivalStream(self.processes)
+            self.queue_service.admit_arrivals(self.arrivals, current_time)
+            self.logger.log_queues(self.queues, current_time)
+            if self.visualizer and isinstance(self.processes, (list, tuple)):
+                # A lazy arrival stream can't be walked in advance; its processes are drawn grey
+                self.visualizer.assign_colors(self.processes)
+        arrivals = self.arrivals
+
+        running_process, running_queue_idx, gantt_start_time = self.running or (None, None, None)
+
+        while (any(not q.is_empty() for q in self.queues) or running_process
+               or arrivals.next_arrival_time() is not None or self.queue_service.blocked):
+            if self.cancelled or (until is not None and current_time >= until):
+                self.current_time = current_time
+                self.running = (running_process, running_queue_idx, gantt_start_time) if running_process else None
+                return self.gantt_events
+            profiler = self.profiler
+            if profiler:
+                profiler.begin_tick(current_time)
+            self.queue_service.admit_arrivals(arrivals, current_time)
+            # Processes whose I/O burst ended rejoin their queue
+            self.queue_service.wake_processes(current_time)
             # Promote processes that have waited too long
             self.queue_service.promote_processes(current_time, self.promotion_threshold)
+            if profiler:
+                profiler.phase('promotion', current_time)
 
             # If no process is running, pick the next one
             if not running_process:
@@ -39,7 +116,25 @@ class MLFQ:
                         running_queue_idx = i
                         running_process.remaining_time_slice = self.time_quantum[i]
                         gantt_start_time = current_time  # Mark start time for Gantt
+                        self.trace.record(DISPATCH, current_time, running_process.process_id,
+                                          i, running_process.remaining_time_slice)
+                        self.metrics.on_dispatch(running_process.process_id, current_time)
                         break
+            if profiler:
+                profiler.phase('selection', current_time)
+            if not running_process:
+                # The CPU idles until the next process arrives or wakes up
+                current_time = next_event_time(arrivals.next_arrival_time(),
+                                               self.queue_service.next_wake_time())
+                if profiler:
+                    profiler.end_tick(current_time)
+                continue
+
+            # Everything stamped current_time is recorded, so its frame can be drawn
+            if self.renderer:
+                # The renderer charges each frame, the last one drawn being this tick's, to frame_render
+                self.renderer.profiler = profiler
+                self.renderer.render_until(current_time)
 
             # If a process is running, execute it for one time unit
             if running_process:
@@ -47,48 +142,66 @@ class MLFQ:
                 running_process.remaining_time_slice -= 1
                 # Reset waiting time since it's now running
                 running_process.entry_time = current_time + 1
+                if profiler:
+                    profiler.phase('execution', current_time)
 
-                # --- Show running process in its queue for visualization ---
-                if running_process.burst_time > 0:
-                    self.queues[running_queue_idx].processes.insert(0, running_process)
-                    self.queue_service.print_queues(current_time + 1)
-                    self.visualizer.save_queue_image(self.queues, current_time + 1)
-                    self.queues[running_queue_idx].processes.pop(0)
-                else:
-                    # If finished, do not show in queue
-                    self.queue_service.print_queues(current_time + 1)
-                    self.visualizer.save_queue_image(self.queues, current_time + 1)
+                # --- Show running process in its queue for the console dump ---
+                if self.logger.per_tick:
+                    if running_process.burst_time > 0:
+                        self.queues[running_queue_idx].push_front(running_process)
+                        self.logger.log_queues(self.queues, current_time + 1)
+                        self.queues[running_queue_idx].remove(running_process)
+                    else:
+                        # If finished, do not show in queue
+                        self.logger.log_queues(self.queues, current_time + 1)
+                    if profiler:
+                        profiler.phase('console', current_time)
                 # ---------------------------------------------------------
 
-                self.root.after(500, lambda: None)
                 # Handle demotion or finishing after tick
-                if running_process.burst_time == 0:
-                    # Record Gantt event for finishing process
-                    self.visualizer.record_gantt_event(
-                        running_process.process_id,
-                        gantt_start_time,
-                        current_time + 1,
-                        running_queue_idx
-                    )
-                    running_process = None
-                    running_queue_idx = None
-                    gantt_start_time = None
-                elif running_process.remaining_time_slice == 0:
-                    # Record Gantt event for time slice expiration
-                    self.visualizer.record_gantt_event(
-                        running_process.process_id,
-                        gantt_start_time,
-                        current_time + 1,
-                        running_queue_idx
-                    )
-                    self.queue_service.demote_process(running_process, current_time + 1, running_queue_idx)
+                if running_process.burst_time == 0 or running_process.remaining_time_slice == 0:
+                    self.trace.record(STOP, current_time + 1, running_process.process_id,
+                                      running_queue_idx, running_process.burst_time)
+                    finished = running_process.burst_time == 0 and not running_process.io_bursts
+                    self.metrics.on_stop(running_process.process_id, gantt_start_time,
+                                         current_time + 1, finished)
+                    self.gantt_events.append((running_process.process_id, gantt_start_time,
+                                              current_time + 1, running_queue_idx))
+                    if running_process.burst_time > 0:
+                        # Time slice expired
+                        self.queue_service.demote_process(running_process, current_time + 1, running_queue_idx)
+                    elif not finished:
+                        # CPU burst done, the process blocks on I/O
+                        self.queue_service.block_process(running_process, current_time + 1, running_queue_idx)
                     running_process = None
                     running_queue_idx = None
                     gantt_start_time = None
+                if profiler:
+                    profiler.phase('execution', current_time)
 
                 current_time += 1
-                time.sleep(0.5)
+                self.clock.tick(current_time)
+                if profiler:
+                    profiler.phase('sleep', current_time)
+                    profiler.end_tick(current_time)
             else:
                 break
 
-        self.visualizer.create_animation()
\ No newline at end of file
+        self.current_time = current_time
+        self.running = None
+        self.finished = True
+        self.logger.log_summary(self.metrics)
+        self.logger.close()
+        profiler = self.profiler
+        if self.visualizer:
+            if profiler:
+                # The last frames and Gantt bars, and finishing the animation files; timed, but not a tick
+                profiler.begin_phases(current_time)
+            self.renderer.profiler = profiler
+            self.renderer.render_until(current_time)
+            self.visualizer.create_animation()
+            if profiler:
+                profiler.phase('gantt_render', current_time)
+        if profiler:
+            profiler.end_run(current_time)
+        return self.gantt_events
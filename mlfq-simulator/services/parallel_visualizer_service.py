@@ -0,0 +1,166 @@
+import math
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from .animation_writer import AnimationWriter, encode_gif_frame
+from .visualizer_service import (GanttChart, cleanup_frames, close_animations, draw_queue_frame,
+                                 largest_burst, process_color_map, queue_snapshot, save_png)
+
+# Figures and settings of the current worker process, set once by _init_worker
+_worker = {}
+
+def _init_worker(process_colors, figsize, gantt_figsize, dpi, save_frames, gif_delay):
+    figure = Figure(figsize=figsize, dpi=dpi)
+    gantt_figure = Figure(figsize=gantt_figsize, dpi=dpi)
+    _worker.update(process_colors=process_colors, save_frames=save_frames, gif_delay=gif_delay,
+                   figure=figure, canvas=FigureCanvasAgg(figure),
+                   gantt_figure=gantt_figure, gantt_canvas=FigureCanvasAgg(gantt_figure))
+
+def _finish_frame(frame, path):
+    """Optionally dump the frame as PNG and return what the writer needs: a GIF block or RGB pixels."""
+    if _worker['save_frames']:
+        save_png(path, frame)
+    if _worker['gif_delay'] is None:
+        return frame[..., :3].copy()
+    return encode_gif_frame(frame, _worker['gif_delay']), frame.shape[1], frame.shape[0]
+
+def _render_queue_frames(output_dir, jobs, max_burst_time):
+    figure, canvas = _worker['figure'], _worker['canvas']
+    results = []
+    for index, current_time, snapshot in jobs:
+        draw_queue_frame(figure, snapshot, current_time, _worker['process_colors'], max_burst_time)
+        canvas.draw()
+        frame = np.asarray(canvas.buffer_rgba())
+        results.append(_finish_frame(frame, os.path.join(output_dir, f'frame_{index}.png')))
+    return results
+
+def _render_gantt_frames(output_dir, events_path, first, last, end_time):
+    """
+    Render the Gantt frames of events first to last - 1 of the shared event
+    file. The worker's chart keeps the bars it drew for earlier chunks, so
+    only the bars between those and first are drawn, once, as background.
+    """
+    colors = _worker['process_colors']
+    # Chunks are taken in submission order, so a worker only starts over for a new chart
+    if _worker.get('gantt_events_path') != events_path or _worker['gantt_drawn'] > first:
+        _worker.update(gantt_events_path=events_path, gantt_events=np.load(events_path, mmap_mode='r'),
+                       gantt_chart=GanttChart(_worker['gantt_figure'], _worker['gantt_canvas']), gantt_drawn=0)
+        _worker['gantt_chart'].set_end_time(end_time)
+    chart, drawn = _worker['gantt_chart'], _worker['gantt_drawn']
+    results = []
+    for index, (pid, start, end, _) in enumerate(_worker['gantt_events'][drawn:last].tolist(), drawn + 1):
+        chart.add_bar(pid, start, end, colors.get(pid, '#CCCCCC'))
+        if index > first:
+            results.append(_finish_frame(chart.frame(), os.path.join(output_dir, f'gantt_frame_{index}.png')))
+    _worker['gantt_drawn'] = last
+    return results
+
+
+class ParallelVisualizerService:
+    """
+    Visualizer for batch runs that rasterizes frames in a process pool.
+    It accepts the same calls as VisualizerService (typically from a
+    TraceRenderer), but only snapshots queue state and Gantt events; workers
+    keep their own figures, render and encode frames in parallel, and the
+    results are streamed into the animation files in frame order.
+    """
+    def __init__(self, output_dir="result", max_workers=None, chunk_size=8,
+                 figsize=(6, 4), gantt_figsize=(10, 2), dpi=100,
+                 save_frames=False, animation_format="gif"):
+        self.output_dir = output_dir
+        os.makedirs(self.output_dir, exist_ok=True)
+        cleanup_frames(self.output_dir)
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.figure_options = (figsize, gantt_figsize, dpi, save_frames)
+        self.animation = AnimationWriter(os.path.join(self.output_dir, f'mlfq_animation.{animation_format}'))
+        self.gantt_animation = AnimationWriter(os.path.join(self.output_dir, f'mlfq_gantt_chart.{animation_format}'))
+        self.process_colors = {}
+        self.frame_count = 0
+        self.max_burst_time = 0
+        self.gantt_events = []
+        self.gantt_end_time = 0
+        self.gantt_events_path = None  # Shared with the workers while the Gantt frames render
+        self.pending_frames = []  # Queue frame jobs not yet sent to the pool
+        self.jobs = deque()       # (writer, future) in submission order
+        self.executor = None
+
+    def assign_colors(self, processes):
+        self.process_colors = process_color_map(processes)
+        self.set_max_burst_time(largest_burst(processes))
+
+    def set_max_burst_time(self, burst_time):
+        self.max_burst_time = max(self.max_burst_time, burst_time)
+
+    def save_queue_image(self, queues, current_time):
+        # Processes that arrive later may need a wider axis than the ones known so far
+        self.set_max_burst_time(max((p.burst_time for queue in queues for p in queue), default=0))
+        self.pending_frames.append((self.frame_count, current_time, queue_snapshot(queues, current_time)))
+        self.frame_count += 1
+        if len(self.pending_frames) >= self.chunk_size:
+            self._submit_queue_frames()
+
+    def record_gantt_event(self, process_id, start_time, end_time, queue_priority):
+        self.gantt_events.append((process_id, start_time, end_time, queue_priority))
+
+    def set_gantt_end_time(self, end_time):
+        self.gantt_end_time = max(self.gantt_end_time, end_time)
+
+    def generate_gantt_chart(self):
+        """
+        Send the Gantt frames to the pool in contiguous chunks. The events are
+        written once to a file the workers share, and a chunk only carries
+        the range of events it draws; a worker keeps its chart between
+        chunks, so it draws every earlier bar at most once.
+        """
+        if not self.gantt_events:
+            print("No Gantt events to plot.")
+            return
+        end_time = max(self.gantt_end_time, max(end for _, _, end, _ in self.gantt_events))
+        self.gantt_events_path = os.path.join(self.output_dir, 'gantt_events.npy')
+        np.save(self.gantt_events_path, np.array(self.gantt_events, dtype=np.int64))
+        chunk = max(self.chunk_size, math.ceil(len(self.gantt_events) / (4 * self.max_workers)))
+        for first in range(0, len(self.gantt_events), chunk):
+            self._submit(self.gantt_animation, _render_gantt_frames, self.output_dir, self.gantt_events_path,
+                         first, min(first + chunk, len(self.gantt_events)), end_time)
+
+    def create_animation(self):
+        """Wait for every frame to be rendered and finish both animations."""
+        self._submit_queue_frames()
+        self.generate_gantt_chart()
+        self._drain(0)
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.gantt_events_path is not None:
+            os.remove(self.gantt_events_path)
+            self.gantt_events_path = None
+        close_animations(self.animation, self.gantt_animation)
+
+    def _submit_queue_frames(self):
+        if self.pending_frames:
+            self._submit(self.animation, _render_queue_frames,
+                         self.output_dir, self.pending_frames, self.max_burst_time)
+            self.pending_frames = []
+
+    def _submit(self, writer, fn, *args):
+        if self.executor is None:
+            gif_delay = self.animation.delay if self.animation.is_gif else None
+            self.executor = ProcessPoolExecutor(
+                self.max_workers, initializer=_init_worker,
+                initargs=(self.process_colors, *self.figure_options, gif_delay))
+        self.jobs.append((writer, self.executor.submit(fn, *args)))
+        # Keep a bounded number of jobs in flight so frames don't pile up in memory
+        self._drain(2 * self.max_workers)
+
+    def _drain(self, in_flight):
+        while len(self.jobs) > in_flight:
+            writer, future = self.jobs.popleft()
+            for result in future.result():
+                if writer.is_gif:
+                    writer.append_encoded(*result)
+                else:
+                    writer.append(result)
@@ -0,0 +1,127 @@
+import sys
+import time
+
+# Phases of a tick of MLFQ.run, in the order they happen
+PHASES = ('promotion', 'selection', 'execution', 'console', 'frame_render', 'gantt_render', 'sleep')
+
+class ProfilerObserver:
+    """
+    Interface for code that wants to follow a PhaseProfiler, e.g. to feed an
+    external profiler or start cProfile on slow ticks. Override what you need.
+    """
+    def on_phase(self, phase, seconds, current_time):
+        pass
+
+    def on_tick(self, current_time, seconds, allocated_blocks):
+        pass
+
+    def on_end(self, profiler):
+        pass
+
+
+class PhaseProfiler:
+    """
+    Wall time spent in each phase of MLFQ.run. The scheduler marks the end
+    of every phase, and the time since the previous mark is charged to it, so
+    a phase costs one timer call. Attach it with MLFQ(profiler=...) or by
+    setting scheduler.profiler, also while the run is in progress; without
+    one the loop only checks for None. With count_allocations, it also counts
+    the memory blocks each tick leaves allocated, which walks the allocator's
+    arenas twice per tick and is much slower. With a stream, the report is
+    written to it when the run ends.
+    """
+    def __init__(self, stream=None, count_allocations=False, timer=time.perf_counter):
+        self.stream = stream
+        self.count_allocations = count_allocations
+        self.timer = timer
+        self.observers = []
+        self.seconds = dict.fromkeys(PHASES, 0.0)
+        self.calls = dict.fromkeys(PHASES, 0)
+        self.ticks = 0
+        self.tick_seconds = 0.0
+        self.max_tick_seconds = 0.0
+        # CPython has no cheap allocation counter, so this is the net growth in allocated blocks
+        self.allocated_blocks = 0
+        self.max_tick_blocks = 0
+        self.mark = None
+        self.tick_start = None
+        self.tick_blocks = 0
+
+    def add_observer(self, observer):
+        self.observers.append(observer)
+
+    def remove_observer(self, observer):
+        self.observers.remove(observer)
+
+    def begin_tick(self, current_time):
+        if self.count_allocations:
+            self.tick_blocks = sys.getallocatedblocks()
+        self.tick_start = self.mark = self.timer()
+
+    def begin_phases(self, current_time):
+        """Start timing phases outside of a tick, e.g. the rendering after the last one."""
+        self.mark = self.timer()
+
+    def phase(self, name, current_time):
+        """End phase name, which started at the previous mark."""
+        now = self.timer()
+        if self.mark is None:
+            # Attached in the middle of a tick; start with the next mark
+            self.mark = now
+            return
+        seconds = now - self.mark
+        self.mark = now
+        self.seconds[name] += seconds
+        self.calls[name] += 1
+        for observer in self.observers:
+            observer.on_phase(name, seconds, current_time)
+
+    def end_tick(self, current_time):
+        if self.tick_start is None:
+            return
+        seconds = self.timer() - self.tick_start
+        blocks = sys.getallocatedblocks() - self.tick_blocks if self.count_allocations else 0
+        self.ticks += 1
+        self.tick_seconds += seconds
+        self.max_tick_seconds = max(self.max_tick_seconds, seconds)
+        self.allocated_blocks += blocks
+        self.max_tick_blocks = max(self.max_tick_blocks, blocks)
+        self.tick_start = self.mark = None
+        for observer in self.observers:
+            observer.on_tick(current_time, seconds, blocks)
+
+    def end_run(self, current_time):
+        """Called by the scheduler once the run is over."""
+        self.tick_start = self.mark = None
+        for observer in self.observers:
+            observer.on_end(self)
+        if self.stream is not None:
+            self.stream.write(self.report() + '\n')
+            self.stream.flush()
+
+    def summary(self):
+        total = sum(self.seconds.values())
+        ticks = self.ticks or 1
+        return {
+            'ticks': self.ticks,
+            'seconds': total,
+            'phases': {name: {'seconds': self.seconds[name], 'calls': self.calls[name],
+                              'share': self.seconds[name] / total if total else 0.0,
+                              'per_tick': self.seconds[name] / ticks} for name in PHASES},
+            'max_tick_seconds': self.max_tick_seconds,
+            'avg_allocated_blocks': self.allocated_blocks / ticks if self.count_allocations else None,
+            'max_allocated_blocks': self.max_tick_blocks if self.count_allocations else None,
+        }
+
+    def report(self):
+        s = self.summary()
+        lines = [f"Profile of {s['ticks']} ticks, {s['seconds']:.3f} s"
+                 f" (slowest tick {s['max_tick_seconds'] * 1e3:.2f} ms)",
+                 f"  {'phase':<13} {'seconds':>9} {'share':>7} {'us/tick':>9} {'calls':>9}"]
+        for name, phase in s['phases'].items():
+            lines.append(f"  {name:<13} {phase['seconds']:>9.3f} {phase['share']:>7.1%}"
+                         f" {phase['per_tick'] * 1e6:>9.1f} {phase['calls']:>9}")
+        if self.count_allocations:
+            lines.append(f"  Allocated blocks per tick: avg {s['avg_allocated_blocks']:.1f}"
+                         f" | max {s['max_allocated_blocks']}")
+        return '\n'.join(lines)
@@ -1,27 +1,91 @@
+from ..models.blocked_set import BlockedSet
+from ..models.promotion_index import PromotionIndex
+from .logging_service import format_queues
+from .trace_service import BLOCK, ENQUEUE, PROMOTE
+
 class QueueService:
-    def __init__(self, queues):
+    def __init__(self, queues, trace=None, metrics=None):
         self.queues = queues
+        self.trace = trace
+        self.metrics = metrics
+        # Queue 0 has nowhere to be promoted to, so only lower queues are indexed
+        self.promotion_index = PromotionIndex()
+        for queue in self.queues[1:]:
+            queue.promotion_index = self.promotion_index
+        self.blocked = BlockedSet()
+
+    def admit_process(self, process, current_time):
+        """Place a new process in the highest priority queue."""
+        self.queues[0].enqueue(process, current_time)
+        if self.trace is not None:
+            self.trace.record(ENQUEUE, current_time, process.process_id, 0, process.burst_time)
+        if self.metrics is not None:
+            cpu_time, io_time = process.burst_time, 0
+            for io, cpu in process.io_bursts or ():
+                cpu_time += cpu
+                io_time += io
+            self.metrics.on_admit(process.process_id, cpu_time, current_time, io_time)
+
+    def admit_arrivals(self, arrivals, current_time):
+        """Admit every process of the ArrivalStream that has arrived by current_time."""
+        for process in arrivals.pop_arrived(current_time):
+            self.admit_process(process, current_time)
 
     def promote_processes(self, current_time, promotion_threshold):
         """Promote processes waiting too long from lower queues to a higher queue."""
-        for i in range(1, len(self.queues)):
-            queue = self.queues[i]
-            for process in list(queue.processes):
-                if current_time - process.entry_time >= promotion_threshold:
-                    queue.processes.remove(process)
-                    self.queues[i - 1].enqueue(process, current_time)
+        due = self.promotion_index.pop_due(current_time - promotion_threshold)
+        for process, priority in due:
+            self.queues[priority].remove(process)
+            self.queues[priority - 1].enqueue(process, current_time)
+            if self.trace is not None:
+                self.trace.record(PROMOTE, current_time, process.process_id, priority)
+            if self.metrics is not None:
+                self.metrics.on_promote(process.process_id, priority)
+
+    def next_promotion_time(self, promotion_threshold):
+        """Earliest time at which promote_processes will move a process, or None."""
+        entry_time = self.promotion_index.peek()
+        return None if entry_time is None else entry_time + promotion_threshold
 
     def demote_process(self, process, current_time, current_queue_index):
         """Demote a process to the next lower-priority queue."""
         new_priority = min(current_queue_index + 1, len(self.queues) - 1)
         self.queues[new_priority].enqueue(process, current_time)
+        if self.trace is not None:
+            self.trace.record(ENQUEUE, current_time, process.process_id, new_priority, process.burst_time)
+        if self.metrics is not None:
+            self.metrics.on_demote(process.process_id, current_queue_index, new_priority)
+
+    def block_process(self, process, current_time, current_queue_index):
+        """
+        Start the next I/O burst of a process whose CPU burst just ended. A
+        process that yields before its time slice runs out keeps its level;
+        one that used the whole slice is demoted when it wakes up.
+        """
+        io_time, process.burst_time = process.io_bursts.pop(0)
+        new_priority = current_queue_index
+        if process.remaining_time_slice == 0:
+            new_priority = min(current_queue_index + 1, len(self.queues) - 1)
+            if self.metrics is not None:
+                self.metrics.on_demote(process.process_id, current_queue_index, new_priority)
+        self.blocked.block(process, new_priority, current_time + io_time)
+        if self.trace is not None:
+            self.trace.record(BLOCK, current_time, process.process_id, new_priority, current_time + io_time)
+        if self.metrics is not None:
+            self.metrics.on_block(process.process_id, current_time)
+
+    def wake_processes(self, current_time):
+        """Move every process whose I/O burst has ended back to the tail of its queue."""
+        for process, priority in self.blocked.pop_woken(current_time):
+            self.queues[priority].enqueue(process, current_time)
+            if self.trace is not None:
+                self.trace.record(ENQUEUE, current_time, process.process_id, priority, process.burst_time)
+            if self.metrics is not None:
+                self.metrics.on_wake(process.process_id, current_time)
+
+    def next_wake_time(self):
+        """Earliest time at which wake_processes will move a process, or None."""
+        return self.blocked.next_wake_time()
 
     def print_queues(self, current_time):
-        print(f"\nTime: {current_time}")
-        for queue in self.queues:
-            priority_name = ["High", "Medium", "Low"][queue.priority] if queue.priority < 3 else f"Queue {queue.priority}"
-            print(f"Queue {queue.priority} ({priority_name}):")
-            for p in queue.processes:
-                wt = current_time - p.entry_time
-                rt = p.remaining_time_slice if p.remaining_time_slice is not None else "-"
-                print(f"  Process P{p.process_id} | Remaining Burst: {p.burst_time} | Priority: {p.priority} | WT: {wt} | RT Slice: {rt}")
\ No newline at end of file
+        print(format_queues(self.queues, current_time))
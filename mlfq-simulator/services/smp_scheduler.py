@@ -0,0 +1,146 @@
+from ..models.queue import Queue
+from .event_scheduler import next_event_time
+from .queue_service import QueueService
+from .workload_service import ArrivalStream
+
+BALANCING_POLICIES = ('none', 'steal', 'migrate')
+
+class Core:
+    """One simulated CPU with its own queue levels, managed by its own QueueService."""
+    def __init__(self, core_id, num_queues, metrics=None):
+        self.core_id = core_id
+        self.queues = [Queue(i) for i in range(num_queues)]
+        self.queue_service = QueueService(self.queues, metrics=metrics)
+        self.running = None  # (process, queue_priority, start_time, end_time)
+
+    def queued(self):
+        return sum(len(queue) for queue in self.queues)
+
+    def load(self):
+        return self.queued() + (self.running is not None)
+
+    def pop_migrant(self):
+        """
+        Take the process that would wait longest here, the tail of the lowest
+        priority non-empty queue, and return it with its queue priority.
+        """
+        for queue in reversed(self.queues):
+            if not queue.is_empty():
+                return queue.pop_back(), queue.priority
+        return None, None
+
+
+class SMPMLFQ:
+    """
+    Event-driven MLFQ on num_cores simulated CPUs. Every core has its own
+    queue levels with the usual promotion, demotion and I/O rules; new
+    processes go to the least loaded core, and woken processes return to the
+    core they blocked on. Load balancing is one of:
+
+    - 'none': processes stay on the core they were placed on
+    - 'steal': a core that runs out of work takes a queued process from the
+      most loaded core
+    - 'migrate': every migration_interval time units, processes are moved
+      from the most to the least loaded core until loads differ by at most one
+
+    A migrated process keeps its level and re-enters the tail of that queue.
+    With one core the schedule is the same as EventDrivenMLFQ; Gantt events
+    carry the core as a fifth field.
+    """
+    def __init__(self, processes, time_quantum, promotion_threshold, num_cores=2, num_queues=3,
+                 balancing='steal', migration_interval=10, metrics=None, record_gantt=True):
+        if balancing not in BALANCING_POLICIES:
+            raise ValueError(f"Unknown balancing policy {balancing!r}, expected one of {', '.join(BALANCING_POLICIES)}")
+        self.processes = processes
+        self.cores = [Core(i, num_queues, metrics) for i in range(num_cores)]
+        self.time_quantum = time_quantum
+        self.promotion_threshold = promotion_threshold
+        self.balancing = balancing
+        self.migration_interval = migration_interval
+        self.metrics = metrics
+        self.record_gantt = record_gantt
+        self.gantt_events = []  # (process_id, start_time, end_time, queue_priority, core)
+
+    def run(self):
+        arrivals = ArrivalStream(self.processes)
+        next_migration = self.migration_interval
+        current_time = 0
+        while True:
+            for core in self.cores:
+                if core.running is not None and core.running[3] == current_time:
+                    self._stop(core)
+            for process in arrivals.pop_arrived(current_time):
+                min(self.cores, key=Core.load).queue_service.admit_process(process, current_time)
+            for core in self.cores:
+                core.queue_service.wake_processes(current_time)
+                core.queue_service.promote_processes(current_time, self.promotion_threshold)
+            if self.balancing == 'migrate' and current_time >= next_migration:
+                self._rebalance(current_time)
+                next_migration = (current_time // self.migration_interval + 1) * self.migration_interval
+            for core in self.cores:
+                if core.running is None:
+                    self._dispatch(core, current_time)
+
+            times = [arrivals.next_arrival_time()]
+            for core in self.cores:
+                if core.running is not None:
+                    times.append(core.running[3])
+                times.append(core.queue_service.next_wake_time())
+                times.append(core.queue_service.next_promotion_time(self.promotion_threshold))
+            if self.balancing == 'migrate' and any(core.queued() for core in self.cores):
+                times.append(next_migration)
+            next_time = next_event_time(*times)
+            if next_time is None:
+                break
+            # Promotions run once per time unit, as in the per-tick loop
+            current_time = max(current_time + 1, next_time)
+
+        return self.gantt_events
+
+    def _dispatch(self, core, current_time):
+        if self.balancing == 'steal' and not core.queued():
+            victim = max(self.cores, key=Core.queued)
+            if victim.queued():
+                self._migrate(victim, core, current_time)
+        running_queue_idx = next(
+            (i for i, queue in enumerate(core.queues) if not queue.is_empty()), None)
+        if running_queue_idx is None:
+            return
+        process = core.queues[running_queue_idx].dequeue()
+        time_slice = self.time_quantum[running_queue_idx]
+        run_time = min(process.burst_time, time_slice)
+        process.remaining_time_slice = time_slice
+        core.running = (process, running_queue_idx, current_time, current_time + run_time)
+        if self.metrics is not None:
+            self.metrics.on_dispatch(process.process_id, current_time, core.core_id)
+
+    def _stop(self, core):
+        process, running_queue_idx, start_time, end_time = core.running
+        core.running = None
+        run_time = end_time - start_time
+        process.burst_time -= run_time
+        process.remaining_time_slice -= run_time
+        process.entry_time = end_time
+        finished = process.burst_time == 0 and not process.io_bursts
+        if self.metrics is not None:
+            self.metrics.on_stop(process.process_id, start_time, end_time, finished, core.core_id)
+        if self.record_gantt:
+            self.gantt_events.append((process.process_id, start_time, end_time, running_queue_idx, core.core_id))
+        if process.burst_time > 0:
+            core.queue_service.demote_process(process, end_time, running_queue_idx)
+        elif not finished:
+            core.queue_service.block_process(process, end_time, running_queue_idx)
+
+    def _rebalance(self, current_time):
+        while True:
+            busiest = max(self.cores, key=Core.queued)
+            idlest = min(self.cores, key=Core.load)
+            if not busiest.queued() or busiest.load() - idlest.load() <= 1:
+                return
+            self._migrate(busiest, idlest, current_time)
+
+    def _migrate(self, source, target, current_time):
+        process, priority = source.pop_migrant()
+        target.queues[priority].enqueue(process, current_time)
+        if self.metrics is not None:
+            self.metrics.on_migrate(process.process_id, source.core_id, target.core_id)
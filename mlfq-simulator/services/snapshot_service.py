@@ -0,0 +1,433 @@
+import os
+import shutil
+import struct
+import zlib
+from array import array
+from collections import Counter
+from itertools import islice
+from ..models.process import Process
+from .metrics_service import PROCESS_FIELDS
+from .trace_service import RECORD_SIZE
+from .workload_service import ArrivalStream
+
+MAGIC = b'MLFQSNAP'
+VERSION = 3
+LOG_MAGIC = b'MLFQHIST'
+LOG_LENGTH = struct.Struct('<Q')  # Prefix of each compressed log entry
+CHECKPOINT_LEVEL = 1  # Checkpoints are written often, so they trade some size for speed
+
+# Tags of the value encoding: a compact, self-describing subset of Python values
+# (None, bools, ints, floats, strings, lists, dicts and arrays of 64-bit ints)
+NONE_TAG, TRUE_TAG, FALSE_TAG, INT_TAG, FLOAT_TAG, STR_TAG, LIST_TAG, DICT_TAG, ARRAY_TAG = b'NTFifsldq'
+
+def _write_varint(out, n):
+    while n >= 0x80:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    out.append(n)
+
+def _read_varint(data, pos):
+    n = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        n |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return n, pos
+        shift += 7
+
+def encode_value(value, out):
+    if value is None:
+        out.append(NONE_TAG)
+    elif value is True:
+        out.append(TRUE_TAG)
+    elif value is False:
+        out.append(FALSE_TAG)
+    elif isinstance(value, int):
+        out.append(INT_TAG)
+        # Zigzag, so small negative numbers stay short too
+        _write_varint(out, value << 1 if value >= 0 else (~value << 1) | 1)
+    elif isinstance(value, float):
+        out.append(FLOAT_TAG)
+        out += struct.pack('<d', value)
+    elif isinstance(value, str):
+        data = value.encode()
+        out.append(STR_TAG)
+        _write_varint(out, len(data))
+        out += data
+    elif isinstance(value, array):
+        out.append(ARRAY_TAG)
+        _write_varint(out, len(value))
+        out += array('q', value).tobytes()
+    elif isinstance(value, (list, tuple)):
+        out.append(LIST_TAG)
+        _write_varint(out, len(value))
+        for item in value:
+            encode_value(item, out)
+    elif isinstance(value, dict):
+        out.append(DICT_TAG)
+        _write_varint(out, len(value))
+        for key, item in value.items():
+            encode_value(key, out)
+            encode_value(item, out)
+    else:
+        raise TypeError(f"Can't store {type(value).__name__} in a snapshot")
+
+def decode_value(data, pos=0):
+    """Decode the value starting at data[pos]; return it and the position after it."""
+    tag = data[pos]
+    pos += 1
+    if tag == NONE_TAG:
+        return None, pos
+    if tag == TRUE_TAG:
+        return True, pos
+    if tag == FALSE_TAG:
+        return False, pos
+    if tag == INT_TAG:
+        n, pos = _read_varint(data, pos)
+        return (n >> 1) ^ -(n & 1), pos
+    if tag == FLOAT_TAG:
+        return struct.unpack_from('<d', data, pos)[0], pos + 8
+    if tag == STR_TAG:
+        length, pos = _read_varint(data, pos)
+        return bytes(data[pos:pos + length]).decode(), pos + length
+    if tag == ARRAY_TAG:
+        length, pos = _read_varint(data, pos)
+        values = array('q')
+        values.frombytes(data[pos:pos + 8 * length])
+        return values, pos + 8 * length
+    if tag == LIST_TAG:
+        length, pos = _read_varint(data, pos)
+        items = []
+        for _ in range(length):
+            item, pos = decode_value(data, pos)
+            items.append(item)
+        return items, pos
+    if tag == DICT_TAG:
+        length, pos = _read_varint(data, pos)
+        items = {}
+        for _ in range(length):
+            key, pos = decode_value(data, pos)
+            items[key], pos = decode_value(data, pos)
+        return items, pos
+    raise ValueError(f"Corrupt snapshot: unknown tag {tag!r}")
+
+
+def _column(values):
+    return array('q', values)
+
+def _nullable_column(values):
+    """An integer column that may hold None: the values, with 0 for None, and the indices of the Nones."""
+    values = list(values)
+    return {'values': array('q', [0 if value is None else value for value in values]),
+            'nulls': array('q', [i for i, value in enumerate(values) if value is None])}
+
+def _values(column):
+    values = list(column['values'])
+    for i in column['nulls']:
+        values[i] = None
+    return values
+
+def _process_columns(processes):
+    return {
+        'process_id': _column(p.process_id for p in processes),
+        'burst_time': _column(p.burst_time for p in processes),
+        'arrival_time': _column(p.arrival_time for p in processes),
+        'priority': _column(p.priority for p in processes),
+        'entry_time': _column(p.entry_time for p in processes),
+        'remaining_time_slice': _nullable_column(p.remaining_time_slice for p in processes),
+        'io_bursts': [array('q', [t for burst in p.io_bursts for t in burst]) if p.io_bursts else None
+                      for p in processes],
+    }
+
+def _join_process_columns(first, second):
+    columns = {}
+    for name, column in first.items():
+        if name == 'remaining_time_slice':
+            columns[name] = _nullable_column(_values(column) + _values(second[name]))
+        else:
+            columns[name] = column + second[name]
+    return columns
+
+def _metrics_columns(rows):
+    fields = list(zip(*rows)) or [()] * len(PROCESS_FIELDS)
+    return [_nullable_column(field) for field in fields]
+
+def _metrics_rows(columns):
+    return [list(row) for row in zip(*(_values(field) for field in columns))]
+
+def _state(scheduler, pending, metrics_ids=None, gantt_events=None):
+    """
+    The state of a scheduler as plain values. pending are the not yet arrived
+    processes to include, metrics_ids the processes whose metrics records to
+    include (all if None) and gantt_events the events (all if None).
+    """
+    if scheduler.arrivals is None:
+        raise ValueError("The run hasn't started yet")
+    running = getattr(scheduler, 'running', None)
+    queued = [list(queue) for queue in scheduler.queues]
+    blocked = sorted(scheduler.queue_service.blocked.heap, key=lambda entry: entry[:2])
+    processes = [p for queue in queued for p in queue] + [entry[3] for entry in blocked] + pending
+    if running is not None:
+        processes.append(running[0])
+    if gantt_events is None:
+        gantt_events = scheduler.gantt_events
+
+    metrics = None
+    if scheduler.metrics is not None:
+        metrics = scheduler.metrics.get_state(metrics_ids)
+        metrics['processes'] = _metrics_columns(metrics['processes'])
+    return {
+        'current_time': scheduler.current_time,
+        'time_quantum': list(scheduler.time_quantum),
+        'promotion_threshold': scheduler.promotion_threshold,
+        'num_queues': len(scheduler.queues),
+        'finished': scheduler.finished,
+        'processes': _process_columns(processes),
+        'queues': [_column(p.process_id for p in queue) for queue in queued],
+        'running': None if running is None else [running[0].process_id, running[1], running[2]],
+        'blocked': _column(value for wake_time, _, priority, process in blocked
+                           for value in (wake_time, priority, process.process_id)),
+        'pending': _column(p.process_id for p in pending),
+        'metrics': metrics,
+        'trace_length': None if scheduler.trace is None else len(scheduler.trace),
+        'gantt_events': _column(value for event in gantt_events for value in event),
+        'gantt_width': len(scheduler.gantt_events[0]) if scheduler.gantt_events else 4,
+        'history': None,
+    }
+
+def _encode(value, level=zlib.Z_DEFAULT_COMPRESSION):
+    out = bytearray()
+    encode_value(value, out)
+    return zlib.compress(bytes(out), level)
+
+def take_snapshot(scheduler):
+    """
+    Serialize the state of an MLFQ or EventDrivenMLFQ between two time units:
+    the time, every queued, running, blocked and not yet arrived process,
+    the metrics, the Gantt events and how long the trace is. Process IDs
+    must be integers.
+    """
+    return MAGIC + bytes([VERSION]) + _encode(_state(scheduler, scheduler.arrivals.remaining()))
+
+def _decode(data, what):
+    try:
+        value, _ = decode_value(memoryview(zlib.decompress(data)))
+    except (zlib.error, IndexError, struct.error) as e:
+        # E.g. a file cut off by a crash while it was copied
+        raise ValueError(f"Corrupt {what}: {e}")
+    if not isinstance(value, dict):
+        raise ValueError(f"Corrupt {what}: no state found")
+    return value
+
+def read_snapshot(data):
+    """Decode a snapshot made by take_snapshot into its state dict."""
+    if len(data) <= len(MAGIC) or data[:len(MAGIC)] != MAGIC:
+        raise ValueError("Not an MLFQ snapshot")
+    if data[len(MAGIC)] != VERSION:
+        raise ValueError(f"Unsupported snapshot version {data[len(MAGIC)]}")
+    return _decode(data[len(MAGIC) + 1:], 'snapshot')
+
+def restore_snapshot(scheduler, state):
+    """
+    Put the state of a snapshot into a scheduler that hasn't run yet, built
+    with the same number of queues, and return the restored processes. The
+    run then continues exactly as the original one did from the snapshot on.
+    A trace given with the scheduler must hold at least the records up to the
+    snapshot and is cut back to them; an empty one only receives the records
+    from the snapshot on.
+    """
+    if state['history'] is not None:
+        raise ValueError("A checkpoint must be read with load_checkpoint, together with its history log")
+    if len(scheduler.queues) != state['num_queues']:
+        raise ValueError(f"The snapshot has {state['num_queues']} queues, the scheduler {len(scheduler.queues)}")
+    if len(scheduler.time_quantum) < state['num_queues']:
+        raise ValueError(f"The snapshot has {state['num_queues']} queues but there are only "
+                         f"{len(scheduler.time_quantum)} time quanta")
+    columns = state['processes']
+    remaining_time_slices = _values(columns['remaining_time_slice'])
+    processes = {}
+    for i, process_id in enumerate(columns['process_id']):
+        io_bursts = columns['io_bursts'][i]
+        process = Process(process_id, columns['burst_time'][i], columns['arrival_time'][i],
+                          list(zip(io_bursts[::2], io_bursts[1::2])) if io_bursts is not None else None)
+        process.priority = columns['priority'][i]
+        process.entry_time = columns['entry_time'][i]
+        process.remaining_time_slice = remaining_time_slices[i]
+        processes[process_id] = process
+
+    # Re-enqueueing in FIFO order keeps the order of equal promotion and wake-up deadlines
+    for queue, process_ids in zip(scheduler.queues, state['queues']):
+        for process_id in process_ids:
+            process = processes[process_id]
+            queue.enqueue(process, process.entry_time)
+    blocked = state['blocked']
+    for i in range(0, len(blocked), 3):
+        scheduler.queue_service.blocked.block(processes[blocked[i + 2]], blocked[i + 1], blocked[i])
+    scheduler.arrivals = ArrivalStream([processes[process_id] for process_id in state['pending']])
+    if state['running'] is not None:
+        process_id, priority, start_time = state['running']
+        scheduler.running = (processes[process_id], priority, start_time)
+    scheduler.current_time = state['current_time']
+    scheduler.finished = state['finished']
+
+    if state['metrics'] is not None and scheduler.metrics is not None:
+        metrics = dict(state['metrics'])
+        metrics['processes'] = _metrics_rows(metrics['processes'])
+        scheduler.metrics.set_state(metrics)
+    if scheduler.trace and state['trace_length'] is not None:
+        if len(scheduler.trace) < state['trace_length']:
+            raise ValueError(f"The trace has {len(scheduler.trace)} records, the snapshot needs {state['trace_length']}")
+        del scheduler.trace.records[state['trace_length'] * RECORD_SIZE:]
+    events, width = state['gantt_events'], state['gantt_width']
+    scheduler.gantt_events = [tuple(events[i:i + width]) for i in range(0, len(events), width)]
+    return list(processes.values())
+
+def save_snapshot(scheduler, path):
+    # Written next to the old snapshot and swapped in, so a crash never leaves a torn file
+    _write_atomically(path, take_snapshot(scheduler))
+
+def load_snapshot(path):
+    with open(path, 'rb') as f:
+        return read_snapshot(f.read())
+
+def _write_atomically(path, data):
+    with open(path + '.tmp', 'wb') as f:
+        f.write(data)
+    os.replace(path + '.tmp', path)
+
+
+class CheckpointWriter:
+    """
+    Checkpoints a long run to path at a cost that doesn't grow with the run.
+    What only ever grows (the Gantt events, the order processes were
+    admitted in and the metrics of finished processes) is appended to
+    path + '.log' as it happens, once, and so are the not yet arrived
+    processes on the first checkpoint. The snapshot at path, rewritten each
+    time, holds only the live state and how much of the log belongs to it,
+    so a crash between the two writes leaves a consistent pair.
+    Read checkpoints back with load_checkpoint. Needs a process list and a
+    MetricsCollector that keeps its records, as the CLI has.
+    """
+    def __init__(self, path, history=None):
+        self.path = path
+        self.log_path = path + '.log'
+        self.history = history  # From load_checkpoint, to continue its log
+        self.log_size = None
+
+    def _start(self, scheduler):
+        if scheduler.metrics is None or not scheduler.metrics.keep_processes:
+            raise ValueError("Checkpoints need metrics that keep the process records")
+        history = self.history
+        if history is None:
+            with open(self.log_path, 'wb') as f:
+                f.write(LOG_MAGIC)
+            self.log_size = len(LOG_MAGIC)
+            self.gantt_written = self.admitted_written = 0
+            self.live = {}
+            # Processes don't change until they arrive, so the rest of the workload is logged once
+            self.pending_offset = -scheduler.arrivals.consumed
+            self._append({'pending': _process_columns(scheduler.arrivals.remaining())})
+            return
+        if os.path.abspath(history['log_path']) != os.path.abspath(self.log_path):
+            shutil.copyfile(history['log_path'], self.log_path)
+        # Anything after log_size was written after the checkpoint and is replayed from it
+        with open(self.log_path, 'r+b') as f:
+            f.truncate(history['log_size'])
+        self.log_size = history['log_size']
+        self.gantt_written = history['gantt_events']
+        self.admitted_written = history['admitted']
+        self.live = dict.fromkeys(history['live'])
+        self.pending_offset = history['pending_admitted']
+
+    def _append(self, entry):
+        data = _encode(entry, CHECKPOINT_LEVEL)
+        with open(self.log_path, 'ab') as f:
+            f.write(LOG_LENGTH.pack(len(data)) + data)
+        self.log_size += LOG_LENGTH.size + len(data)
+
+    def save(self, scheduler):
+        if self.log_size is None:
+            self._start(scheduler)
+        metrics = scheduler.metrics
+        records = metrics.processes
+        # Records are kept in admission order, so the new ones are at the end
+        admitted = list(islice(reversed(records), metrics.admitted - self.admitted_written))[::-1]
+        self.live.update(dict.fromkeys(admitted))
+        finished = [pid for pid in self.live if records[pid]['completion_time'] is not None]
+        for pid in finished:
+            del self.live[pid]
+        gantt_events = scheduler.gantt_events[self.gantt_written:]
+        self._append({
+            'gantt_events': _column(value for event in gantt_events for value in event),
+            'admitted': _column(admitted),
+            'finished': _metrics_columns([[records[pid][field] for field in PROCESS_FIELDS] for pid in finished]),
+        })
+        self.gantt_written += len(gantt_events)
+        self.admitted_written = metrics.admitted
+
+        state = _state(scheduler, [], metrics_ids=self.live, gantt_events=[])
+        # Grows with the run too, and load_checkpoint rebuilds it from the finished records
+        state['metrics']['turnaround_counts'] = {}
+        state['history'] = {'log_size': self.log_size,
+                            'pending_admitted': self.pending_offset + scheduler.arrivals.consumed}
+        _write_atomically(self.path, MAGIC + bytes([VERSION]) + _encode(state, CHECKPOINT_LEVEL))
+
+
+def _read_log(path, size):
+    with open(path, 'rb') as f:
+        data = f.read(size)
+    if len(data) < size or data[:len(LOG_MAGIC)] != LOG_MAGIC:
+        raise ValueError(f"{path} is missing or shorter than its checkpoint")
+    entries = []
+    pos = len(LOG_MAGIC)
+    while pos < size:
+        if pos + LOG_LENGTH.size > size:
+            raise ValueError(f"Corrupt checkpoint log {path}")
+        length, = LOG_LENGTH.unpack_from(data, pos)
+        pos += LOG_LENGTH.size
+        entries.append(_decode(data[pos:pos + length], 'checkpoint log'))
+        pos += length
+    return entries
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint written by CheckpointWriter, or a snapshot saved with
+    save_snapshot, into a full snapshot state for restore_snapshot. For a
+    checkpoint, also return what a CheckpointWriter needs to continue its
+    log, else None.
+    """
+    state = load_snapshot(path)
+    history = state['history']
+    if history is None:
+        return state, None
+    log_path = path + '.log'
+    entries = _read_log(log_path, history['log_size'])
+    pending = _process_columns([])
+    gantt_events = array('q')
+    admitted = array('q')
+    rows = {}
+    for entry in entries:
+        if 'pending' in entry:
+            pending = entry['pending']
+            continue
+        gantt_events += entry['gantt_events']
+        admitted += entry['admitted']
+        rows.update((row[0], row) for row in _metrics_rows(entry['finished']))
+    live = _metrics_rows(state['metrics']['processes'])
+    rows.update((row[0], row) for row in live)
+
+    start = history['pending_admitted']
+    pending = {name: (_nullable_column(_values(column)[start:]) if name == 'remaining_time_slice'
+                      else column[start:]) for name, column in pending.items()}
+    state['processes'] = _join_process_columns(state['processes'], pending)
+    state['pending'] = pending['process_id']
+    state['gantt_events'] = gantt_events
+    state['metrics']['processes'] = _metrics_columns([rows[pid] for pid in admitted])
+    completion, turnaround = PROCESS_FIELDS.index('completion_time'), PROCESS_FIELDS.index('turnaround_time')
+    state['metrics']['turnaround_counts'] = dict(Counter(row[turnaround] for row in rows.values()
+                                                         if row[completion] is not None))
+    state['history'] = None
+    return state, {'log_path': log_path, 'log_size': history['log_size'], 'pending_admitted': start,
+                   'gantt_events': len(gantt_events) // state['gantt_width'],
+                   'admitted': state['metrics']['admitted'], 'live': [row[0] for row in live]}
@@ -0,0 +1,98 @@
+import csv
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from ..models.process import Process
+from .event_scheduler import EventDrivenMLFQ
+from .metrics_service import MetricsCollector
+
+# Workloads of the current worker process, sent once by _init_worker
+_workloads = {}
+
+def _init_worker(workloads):
+    _workloads.clear()
+    _workloads.update(workloads)
+
+def _run_named(config):
+    return run_config(config, _workloads[config['workload']])
+
+def sweep_grid(quanta, thresholds, workloads, num_queues=None):
+    """
+    Every combination of quanta (each a list of per-queue time quanta),
+    promotion thresholds, workload names and queue counts, as sweep
+    configurations. num_queues is a list of queue counts, or None to use as
+    many queues as each quanta list has; a configuration uses the first
+    num_queues quanta of its list.
+    """
+    if isinstance(num_queues, int):
+        num_queues = [num_queues]
+    for quantum in quanta:
+        for count in num_queues or [len(quantum)]:
+            _check_queues(quantum, count)
+    return [{'workload': workload, 'time_quantum': list(quantum)[:count], 'promotion_threshold': threshold,
+             'num_queues': count}
+            for workload, quantum, threshold in itertools.product(workloads, quanta, thresholds)
+            for count in num_queues or [len(quantum)]]
+
+def _check_queues(time_quantum, num_queues):
+    if num_queues < 1:
+        raise ValueError(f"A configuration needs at least one queue, not {num_queues}")
+    if len(time_quantum) < num_queues:
+        raise ValueError(f"{num_queues} queues need {num_queues} time quanta, got {list(time_quantum)}")
+
+def run_config(config, workload):
+    """
+    Run one configuration on a workload (burst times, or (process_id,
+    burst_time[, arrival_time[, io_bursts]]) tuples) with the headless scheduler and
+    return its result row.
+    """
+    num_queues = config.get('num_queues', len(config['time_quantum']))
+    _check_queues(config['time_quantum'], num_queues)
+    time_quantum = list(config['time_quantum'])[:num_queues]
+    processes = [Process(i, item) if isinstance(item, int) else Process(*item)
+                 for i, item in enumerate(workload, 1)]
+    metrics = MetricsCollector(num_queues)
+    EventDrivenMLFQ(processes, time_quantum, config['promotion_threshold'],
+                    num_queues=num_queues, metrics=metrics).run()
+
+    summary = metrics.summary()
+    return {
+        'workload': config['workload'],
+        'time_quantum': ' '.join(map(str, time_quantum)),
+        'promotion_threshold': config['promotion_threshold'],
+        'num_queues': num_queues,
+        'makespan': summary['makespan'],
+        'avg_turnaround': summary['avg_turnaround'],
+        'avg_waiting': summary['avg_waiting'],
+        'avg_response': summary['avg_response'],
+        'p99_turnaround': summary['p99_turnaround'],
+        'max_turnaround': summary['max_turnaround'],
+        'context_switches': summary['context_switches'],
+        'promotions': ' '.join(map(str, summary['promotions'])),
+        'demotions': ' '.join(map(str, summary['demotions'])),
+        'io_blocks': summary['io_blocks'],
+        'avg_wake_latency': summary['avg_wake_latency'],
+        'cpu_utilization': summary['cpu_utilization'],
+        'throughput': summary['throughput'],
+    }
+
+def run_sweep(configs, workloads, max_workers=None, chunksize=None):
+    """
+    Run every configuration in a process pool and return one result row per
+    configuration, in order. workloads maps a name to a workload; configs
+    refer to it by name, so each worker receives the workloads only once.
+    """
+    configs = list(configs)
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        return [run_config(config, workloads[config['workload']]) for config in configs]
+    chunksize = chunksize or max(1, len(configs) // (4 * max_workers))
+    with ProcessPoolExecutor(max_workers, initializer=_init_worker, initargs=(workloads,)) as executor:
+        return list(executor.map(_run_named, configs, chunksize=chunksize))
+
+def write_sweep_results(rows, path):
+    """Write the result rows as one CSV table."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]) if rows else [])
+        writer.writeheader()
+        writer.writerows(rows)
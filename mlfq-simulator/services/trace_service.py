@@ -0,0 +1,142 @@
+from array import array
+from ..models.process import Process
+from ..models.queue import Queue
+
+# Record kinds. Every record is (kind, time, process_id, queue_priority, value).
+ENQUEUE = 0   # process joins the tail of a queue; value is its remaining burst
+DISPATCH = 1  # process leaves the head of a queue for the CPU; value is its time slice
+STOP = 2      # process leaves the CPU; value is its remaining burst (0 when finished)
+PROMOTE = 3   # process moves from queue_priority to the tail of the queue above
+BLOCK = 4     # process starts an I/O burst after its STOP; queue_priority is where it
+              # returns, value is its wake-up time (it is re-ENQUEUEd then)
+
+RECORD_SIZE = 5
+
+class TraceRecorder:
+    """
+    Compact, append-only log of scheduler state changes. Records are packed
+    into a flat array of 64-bit integers, so a run costs a few dozen bytes per
+    state change and the trace can be replayed, saved or rendered later.
+    Process IDs must be integers.
+    """
+    def __init__(self):
+        self.records = array('q')
+
+    def record(self, kind, time, process_id, queue_priority, value=0):
+        self.records.extend((kind, time, process_id, queue_priority, value))
+
+    def read(self, start=0):
+        """Yield records from index start onwards as tuples."""
+        records = self.records
+        for i in range(start * RECORD_SIZE, len(records), RECORD_SIZE):
+            yield tuple(records[i:i + RECORD_SIZE])
+
+    def end_time(self):
+        return self.records[-4] if self.records else 0
+
+    def __len__(self):
+        return len(self.records) // RECORD_SIZE
+
+    def save(self, path):
+        with open(path, 'wb') as f:
+            self.records.tofile(f)
+
+    @classmethod
+    def load(cls, path):
+        trace = cls()
+        with open(path, 'rb') as f:
+            trace.records.frombytes(f.read())
+        return trace
+
+
+class TraceRenderer:
+    """
+    Replays a trace into a VisualizerService. The queues are rebuilt from the
+    records, so frames can be drawn while the trace is still growing
+    (render_until) or after the run for any window of time (render).
+    A frame at time T shows the state after every record stamped <= T, with
+    the running process at the head of its queue.
+    """
+    def __init__(self, trace, visualizer, num_queues=3, start_time=0, end_time=None, step=1):
+        self.trace = trace
+        self.visualizer = visualizer
+        self.queues = [Queue(i) for i in range(num_queues)]
+        self.processes = {}
+        # (process, queue_priority, dispatch_time, burst_at_dispatch, time_slice)
+        self.running = None
+        self.position = 0
+        self.start_time = start_time
+        self.end_time = end_time
+        self.step = step
+        self.next_frame = start_time
+        self.profiler = None  # Set by the scheduler to split drawing time into frames and Gantt bars
+
+    def render(self):
+        """Render the whole window from the records available now."""
+        end_time = self.trace.end_time()
+        if self.end_time is not None:
+            end_time = min(end_time, self.end_time)
+        self.visualizer.set_gantt_end_time(end_time)
+        # Every burst enters a queue with an ENQUEUE, so the largest one fixes the burst axis up front
+        self.visualizer.set_max_burst_time(max((value for kind, _, _, _, value in self.trace.read()
+                                                if kind == ENQUEUE), default=0))
+        self.render_until(end_time)
+
+    def render_until(self, time):
+        """Apply records up to time and draw every frame up to it. Records stamped <= time must be complete."""
+        for record in self.trace.read(self.position):
+            if record[1] > time:
+                break
+            self._draw_frames_before(record[1])
+            self._apply(*record)
+            self.position += 1
+        self._draw_frames_before(time + 1)
+
+    def _draw_frames_before(self, time):
+        while self.next_frame < time and (self.end_time is None or self.next_frame <= self.end_time):
+            self._draw_frame(self.next_frame)
+            self.next_frame += self.step
+
+    def _draw_frame(self, current_time):
+        if self.running is None:
+            self.visualizer.save_queue_image(self.queues, current_time)
+            if self.profiler:
+                self.profiler.phase('frame_render', current_time)
+            return
+        process, priority, dispatch_time, burst, time_slice = self.running
+        elapsed = current_time - dispatch_time
+        process.burst_time = burst - elapsed
+        process.remaining_time_slice = time_slice - elapsed
+        process.entry_time = current_time
+        self.queues[priority].push_front(process)
+        self.visualizer.save_queue_image(self.queues, current_time)
+        self.queues[priority].remove(process)
+        if self.profiler:
+            self.profiler.phase('frame_render', current_time)
+
+    def _apply(self, kind, time, process_id, priority, value):
+        if kind == ENQUEUE:
+            process = self.processes.get(process_id)
+            if process is None:
+                process = self.processes[process_id] = Process(process_id, value)
+            process.burst_time = value
+            self.queues[priority].enqueue(process, time)
+        elif kind == DISPATCH:
+            process = self.processes[process_id]
+            self.queues[priority].remove(process)
+            self.running = (process, priority, time, process.burst_time, value)
+        elif kind == STOP:
+            process, _, dispatch_time, _, _ = self.running
+            process.burst_time = value
+            self.running = None
+            if value == 0:
+                del self.processes[process_id]
+            if time > self.start_time and (self.end_time is None or dispatch_time <= self.end_time):
+                self.visualizer.record_gantt_event(process_id, dispatch_time, time, priority)
+                if self.profiler:
+                    self.profiler.phase('gantt_render', time)
+        elif kind == PROMOTE:
+            process = self.processes[process_id]
+            self.queues[priority].remove(process)
+            self.queues[priority - 1].enqueue(process, time)
+        # A BLOCKed process is off the queues until its next ENQUEUE, so nothing to draw
@@ -4,131 +4,237 @@ matplotlib.use('Agg')  # Use non-GUI backend for image generation
 import matplotlib.pyplot as plt
 import numpy as np
 import os, glob
+from .animation_writer import AnimationWriter
+
+PRIORITY_LABELS = ["High", "Medium", "Low"]
+
+def process_color_map(processes):
+    color_list = plt.cm.tab10.colors
+    return {p.process_id: color_list[i % len(color_list)] for i, p in enumerate(processes)}
+
+def largest_burst(processes):
+    """The longest CPU burst of any of processes, including those after I/O."""
+    return max((max(p.burst_time, *(cpu for _, cpu in p.io_bursts or ()), 0) for p in processes), default=0)
+
+def queue_snapshot(queues, current_time):
+    """Plain-data copy of what a queue frame shows: (process_id, burst_time, waiting_time) per queue."""
+    return [[(p.process_id, p.burst_time, current_time - p.entry_time) for p in queue]
+            for queue in queues]
+
+def draw_queue_frame(figure, snapshot, current_time, process_colors, max_burst_time):
+    figure.clear()  # Clear previous plot
+    for i, processes in enumerate(snapshot):
+        ax = figure.add_subplot(len(snapshot), 1, i+1)
+        y_positions = np.arange(len(processes))
+        burst_times = [burst for _, burst, _ in processes]
+        labels = [f'P{pid}\nWT:{wt}' for pid, _, wt in processes]
+        colors = [process_colors.get(pid, '#CCCCCC') for pid, _, _ in processes]
+
+        ax.barh(y_positions, burst_times, color=colors, edgecolor='black')
+        ax.set_yticks(y_positions)
+        ax.set_yticklabels(labels)
+        priority_name = PRIORITY_LABELS[i] if i < len(PRIORITY_LABELS) else f'Queue {i}'
+        ax.set_title(f'Queue {i + 1} ({priority_name})')
+        ax.set_xlim(0, max_burst_time)  # Lock x-axis to max_burst_time
+
+    figure.suptitle(f'MLFQ Scheduling - Time {current_time}')
+    figure.tight_layout()
+
+def save_png(path, frame):
+    imageio.imwrite(path, frame)
+
+def close_animations(animation, gantt_animation):
+    """Finish both animation files and report where they were saved."""
+    if animation.close():
+        print(f"Animation saved to {animation.path}")
+    else:
+        print("No frames found to create animation.")
+    if gantt_animation.close():
+        print(f"Gantt chart animation saved to {gantt_animation.path}")
+    else:
+        print("No Gantt chart frames found to create animation.")
+
+def cleanup_frames(output_dir):
+    """Delete existing frame files safely, including Gantt chart frames"""
+    # Remove queue frames
+    for filename in glob.glob(os.path.join(output_dir, 'frame_*.png')):
+        try:
+            os.remove(filename)
+        except PermissionError:
+            print(f"Warning: Could not delete {filename} - file in use")
+    # Remove Gantt chart frames
+    for filename in glob.glob(os.path.join(output_dir, 'gantt_frame_*.png')):
+        try:
+            os.remove(filename)
+        except PermissionError:
+            print(f"Warning: Could not delete {filename} - file in use")
+
+
+class GanttChart:
+    """
+    Gantt chart drawn incrementally: each bar is added to the existing axes
+    and drawn over the previous canvas buffer, so a frame costs one bar.
+    """
+    def __init__(self, figure, canvas):
+        self.figure = figure
+        self.canvas = canvas
+        self.ax = None
+        self.xlim = 0  # Right edge of the time axis
+        self.stale = False  # Bars were added without being drawn
+
+    def reset(self):
+        self.ax = None
+
+    def set_end_time(self, end_time):
+        """Fix the time axis in advance, e.g. when the length of the run is known."""
+        if end_time > self.xlim:
+            self.xlim = end_time
+            if self.ax is not None:
+                self.ax.set_xlim(left=0, right=self.xlim)
+                self.canvas.draw()
+
+    def fit_end_time(self, end_time):
+        """
+        Set the time axis to end exactly at end_time once the run is over, undoing
+        the geometric growth, with one full redraw. Returns whether it changed.
+        """
+        if self.ax is None or self.xlim == end_time:
+            return False
+        self.xlim = end_time
+        self.ax.set_xlim(left=0, right=max(self.xlim, 1))
+        self.stale = False
+        self.figure.tight_layout()
+        self.canvas.draw()
+        return True
+
+    def add_bar(self, process_id, start_time, end_time, color, draw=True):
+        full_redraw = self.ax is None or self.stale
+        if self.ax is None:
+            self.figure.clear() # Clear previous plot
+            self.ax = self.figure.add_subplot(1, 1, 1)
+            self.ax.set_yticks([])
+            self.ax.set_xlabel('Time')
+            self.ax.set_title('Gantt Chart')
+            self.ax.set_xlim(left=0, right=max(self.xlim, 1))
+        ax = self.ax
+
+        bars = ax.barh(0, end_time - start_time, left=start_time, height=0.5, color=color, edgecolor='black')
+        label = ax.text((start_time + end_time) / 2, 0, f'P{process_id}', va='center', ha='center', color='black', fontsize=8)
+
+        if end_time > self.xlim:
+            # Growing the axis moves every bar; grow it geometrically so full redraws stay rare
+            self.xlim = max(end_time, 2 * self.xlim)
+            ax.set_xlim(left=0, right=self.xlim)
+            full_redraw = True
+
+        if not draw:
+            self.stale = True
+        elif full_redraw:
+            self.stale = False
+            self.figure.tight_layout()
+            self.canvas.draw()
+        else:
+            # Bars never move or disappear, so the new ones are drawn over the previous frame
+            for artist in (*bars.patches, label):
+                ax.draw_artist(artist)
+            self.canvas.blit(ax.bbox)
+
+    def frame(self):
+        # The canvas buffer as-is; savefig would redraw every bar again
+        return np.asarray(self.canvas.buffer_rgba())
+
 
 class VisualizerService:
-    def __init__(self, canvas, figure, gantt_canvas, gantt_figure):
+    """
+    Renders queue and Gantt frames into the given canvases and streams each
+    frame straight from the canvas buffer into the animation files. PNG
+    copies of the frames are only written when save_frames is set.
+    """
+    def __init__(self, canvas, figure, gantt_canvas, gantt_figure,
+                 output_dir="result", save_frames=False, animation_format="gif"):
         self.canvas = canvas
         self.figure = figure
         self.gantt_canvas = gantt_canvas
         self.gantt_figure = gantt_figure
         self.process_colors = {}
         self.frame_count = 0  # Initialize frame counter [[1]]
-        self.output_dir = "result"
+        self.output_dir = output_dir
+        self.save_frames = save_frames
         os.makedirs(self.output_dir, exist_ok=True)  # Create directory [[3]]
         self.cleanup_old_frames()
+        self.animation = AnimationWriter(os.path.join(self.output_dir, f'mlfq_animation.{animation_format}'))
+        self.gantt_animation = AnimationWriter(os.path.join(self.output_dir, f'mlfq_gantt_chart.{animation_format}'))
         self.max_burst_time = 0  # Track maximum burst time for x-axis locking
         self.gantt_events = []  # Store (process_id, start_time, end_time, queue_priority)
+        self.gantt_chart = GanttChart(gantt_figure, gantt_canvas)
 
     def assign_colors(self, processes):
-        color_list = plt.cm.tab10.colors[:len(processes)]
-        self.process_colors = {p.process_id: color_list[i] for i, p in enumerate(processes)}
+        """Colors per process, and a burst axis wide enough for every burst of processes."""
+        self.process_colors = process_color_map(processes)
+        self.set_max_burst_time(largest_burst(processes))
+
+    def set_max_burst_time(self, burst_time):
+        """Widen the burst axis of the queue frames to at least burst_time."""
+        self.max_burst_time = max(self.max_burst_time, burst_time)
 
     def save_queue_image(self, queues, current_time):
-        self.figure.clear()  # Clear previous plot
-        priority_labels = ["High", "Medium", "Low"]
-
-        # Update max_burst_time based on the first frame
-        if self.frame_count == 0:
-            self.max_burst_time = max(
-                (p.burst_time for queue in queues for p in queue.processes), default=0
-            )
-
-        for i, queue in enumerate(queues):
-            ax = self.figure.add_subplot(len(queues), 1, i+1)
-            y_positions = np.arange(len(queue.processes))
-            burst_times = [p.burst_time for p in queue.processes]
-            labels = [f'P{p.process_id}\nWT:{current_time - p.entry_time}'
-                     for p in queue.processes]
-            colors = [self.process_colors[p.process_id] for p in queue.processes]
-
-            ax.barh(y_positions, burst_times, color=colors, edgecolor='black')
-            ax.set_yticks(y_positions)
-            ax.set_yticklabels(labels)
-            ax.set_title(f'Queue {queue.priority + 1} ({priority_labels[queue.priority]})')
-            ax.set_xlim(0, self.max_burst_time)  # Lock x-axis to max_burst_time
-
-        self.figure.suptitle(f'MLFQ Scheduling - Time {current_time}')
-        self.figure.tight_layout()
+        # Processes that arrive later may need a wider axis than the ones known so far
+        self.set_max_burst_time(max((p.burst_time for queue in queues for p in queue), default=0))
+
+        snapshot = queue_snapshot(queues, current_time)
+        draw_queue_frame(self.figure, snapshot, current_time, self.process_colors, self.max_burst_time)
         self.canvas.draw()  # Update the Tkinter canvas
 
-        # Save frame to file [[3]]
-        frame_path = os.path.join(self.output_dir, f'frame_{self.frame_count}.png')
-        self.figure.savefig(frame_path)
+        frame = np.asarray(self.canvas.buffer_rgba())
+        self.animation.append(frame)
+        if self.save_frames:
+            save_png(os.path.join(self.output_dir, f'frame_{self.frame_count}.png'), frame)
         self.frame_count += 1  # Increment counter
 
     def create_animation(self):
-        """Generate GIF from saved frames and Gantt chart GIF from saved Gantt frames"""
-        # Create queue animation
-        images = []
-        for i in range(self.frame_count):
-            frame_path = os.path.join(self.output_dir, f'frame_{i}.png')
-            if os.path.exists(frame_path):
-                images.append(imageio.imread(frame_path))
-        animation_path = os.path.join(self.output_dir, 'mlfq_animation.gif')
-        imageio.mimsave(animation_path, images, fps=1)
-        print(f"Animation saved to {animation_path}")
-
-        # Create Gantt chart animation from saved frames
-        gantt_frame_files = sorted(
-            glob.glob(os.path.join(self.output_dir, 'gantt_frame_*.png')),
-            key=lambda x: int(os.path.splitext(os.path.basename(x))[0].split('_')[-1])
-        )
-        gantt_images = [imageio.imread(f) for f in gantt_frame_files]
-        gantt_gif_path = os.path.join(self.output_dir, 'mlfq_gantt_chart.gif')
-        if gantt_images:
-            imageio.mimsave(gantt_gif_path, gantt_images, fps=1)
-            print(f"Gantt chart GIF saved to {gantt_gif_path}")
-        else:
-            print("No Gantt chart frames found to create GIF.")
+        """Finish the queue and Gantt chart animations streamed during the run"""
+        if self.gantt_events and self.gantt_chart.fit_end_time(max(end for _, _, end, _ in self.gantt_events)):
+            # The last frame again, on the final time axis
+            self._save_gantt_frame(len(self.gantt_events))
+        close_animations(self.animation, self.gantt_animation)
 
     def cleanup_old_frames(self):
         """Delete existing frame files safely, including Gantt chart frames"""
-        # Remove queue frames
-        for filename in glob.glob(os.path.join(self.output_dir, 'frame_*.png')):
-            try:
-                os.remove(filename)
-            except PermissionError:
-                print(f"Warning: Could not delete {filename} - file in use")
-        # Remove Gantt chart frames
-        for filename in glob.glob(os.path.join(self.output_dir, 'gantt_frame_*.png')):
-            try:
-                os.remove(filename)
-            except PermissionError:
-                print(f"Warning: Could not delete {filename} - file in use")
+        cleanup_frames(self.output_dir)
 
     def record_gantt_event(self, process_id, start_time, end_time, queue_priority):
         """
         Call this method from the scheduler each time a process runs on CPU.
+        Only the new bar is drawn, and one new Gantt frame is saved.
         """
         self.gantt_events.append((process_id, start_time, end_time, queue_priority))
-        # Generate Gantt chart frames
-        self.generate_gantt_chart()
+        self.gantt_chart.add_bar(process_id, start_time, end_time,
+                                 self.process_colors.get(process_id, '#CCCCCC'))
+        self._save_gantt_frame(len(self.gantt_events))
 
+    def set_gantt_end_time(self, end_time):
+        """Fix the Gantt time axis in advance, e.g. when the length of the run is known."""
+        self.gantt_chart.set_end_time(end_time)
 
     def generate_gantt_chart(self):
         """
-        Generate and save Gantt chart frames from the recorded events.
+        Generate and save Gantt chart frames from the recorded events,
+        replacing the Gantt animation streamed so far.
         """
         if not self.gantt_events:
             print("No Gantt events to plot.")
             return
 
-        color_map = self.process_colors if self.process_colors else {}
-
-        max_time = max((end for _, _, end, _ in self.gantt_events), default=0)
-        for upto in range(1, len(self.gantt_events) + 1):
-            self.gantt_figure.clear() # Clear previous plot
-            ax = self.gantt_figure.add_subplot(1, 1, 1)
-            for idx, (pid, start, end, priority) in enumerate(self.gantt_events[:upto]):
-                color = color_map.get(pid, '#CCCCCC')  # Use process color, fallback to gray
-                ax.barh(0, end - start, left=start, height=0.5, color=color, edgecolor='black')
-                ax.text((start + end) / 2, 0, f'P{pid}', va='center', ha='center', color='black', fontsize=8)
-            ax.set_yticks([])
-            ax.set_xlabel('Time')
-            ax.set_title('Gantt Chart')
-            ax.set_xlim(left=0, right=max_time)
-            self.gantt_figure.tight_layout()
-            # Save each frame as a permanent PNG
-            frame_png_path = os.path.join(self.output_dir, f'gantt_frame_{upto}.png')
-            self.gantt_figure.savefig(frame_png_path)
-            self.gantt_canvas.draw()
+        self.gantt_animation.close()
+        self.gantt_animation = AnimationWriter(self.gantt_animation.path, self.gantt_animation.fps)
+        self.gantt_chart.reset()
+        self.gantt_chart.set_end_time(max(end for _, _, end, _ in self.gantt_events))
+        for upto, (pid, start, end, _) in enumerate(self.gantt_events, 1):
+            self.gantt_chart.add_bar(pid, start, end, self.process_colors.get(pid, '#CCCCCC'))
+            self._save_gantt_frame(upto)
+
+    def _save_gantt_frame(self, index):
+        frame = self.gantt_chart.frame()
+        self.gantt_animation.append(frame)
+        if self.save_frames:
+            save_png(os.path.join(self.output_dir, f'gantt_frame_{index}.png'), frame)
@@ -0,0 +1,63 @@
+import itertools
+import random
+from ..models.process import Process
+
+class ArrivalStream:
+    """
+    Processes in arrival order, consumed lazily as simulated time reaches
+    them. Lists are sorted by arrival time; any other iterable (e.g. a
+    generate_workload generator) must already be in arrival order and is
+    only read one process ahead.
+    """
+    def __init__(self, processes):
+        self.buffer = None  # The sorted list, if processes was one
+        if isinstance(processes, (list, tuple)):
+            processes = self.buffer = sorted(processes, key=lambda p: p.arrival_time)
+        self.iterator = iter(processes)
+        self.next_process = next(self.iterator, None)
+        self.consumed = 0
+
+    def next_arrival_time(self):
+        """Arrival time of the next process, or None when the stream is exhausted."""
+        return None if self.next_process is None else self.next_process.arrival_time
+
+    def pop_arrived(self, current_time):
+        """Yield every process that has arrived by current_time."""
+        while self.next_process is not None and self.next_process.arrival_time <= current_time:
+            process = self.next_process
+            self.next_process = next(self.iterator, None)
+            self.consumed += 1
+            if self.next_process is not None and self.next_process.arrival_time < process.arrival_time:
+                raise ValueError(f"Process {self.next_process.process_id} arrives before process "
+                                 f"{process.process_id}; arrivals must be in arrival order")
+            yield process
+
+    def remaining(self):
+        """The processes that have not arrived yet, in arrival order. Only lists can be copied like this."""
+        if self.buffer is None:
+            raise ValueError("A lazily generated workload can't be copied")
+        return self.buffer[self.consumed:]
+
+
+def generate_workload(count=None, arrival_rate=0.1, burst_distribution='exponential', mean_burst=10,
+                      short_burst=2, long_burst=50, long_fraction=0.1, seed=None, start_id=1):
+    """
+    Lazily generate an open-system workload: Poisson arrivals at arrival_rate
+    processes per time unit, with exponential bursts (mean mean_burst) or
+    bimodal bursts (long_burst with probability long_fraction, else
+    short_burst). Runs forever when count is None; the same seed always
+    yields the same workload.
+    """
+    if burst_distribution not in ('exponential', 'bimodal'):
+        raise ValueError(f"Unknown burst distribution {burst_distribution!r}, expected exponential or bimodal")
+    rng = random.Random(seed)
+    arrival_time = 0.0
+    ids = itertools.count(start_id) if count is None else range(start_id, start_id + count)
+    for process_id in ids:
+        # Poisson arrivals have exponentially distributed gaps
+        arrival_time += rng.expovariate(arrival_rate)
+        if burst_distribution == 'exponential':
+            burst_time = max(1, round(rng.expovariate(1 / mean_burst)))
+        else:
+            burst_time = long_burst if rng.random() < long_fraction else short_burst
+        yield Process(process_id, burst_time, int(arrival_time))
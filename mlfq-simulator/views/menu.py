@@ -1,7 +1,51 @@
+import csv
+import io
+import math
 import tkinter as tk
-from tkinter import ttk, messagebox
+from tkinter import ttk, messagebox, filedialog
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 from matplotlib.figure import Figure
+from ..services.clock_service import MAX_SPEED, MIN_SPEED
+
+CLOCK_LABELS = [("Real time", 'realtime'), ("Max speed", 'max'), ("Step", 'step')]
+MAX_ERRORS_SHOWN = 20
+
+UNSUPPORTED_NOTE = ("the GUI runs processes that all arrive at time 0 and never block on I/O; "
+                    "run the file with python -m mlfq-simulator.cli instead")
+
+def parse_batch(content):
+    """
+    Burst times from pasted or loaded CSV text in one pass: one burst time per
+    line, process_id,burst_time rows, or a header with a burst_time column as
+    in the files of the command-line runner. Returns the burst times and the
+    (line_number, line) of every line without a positive burst time. Raises
+    ValueError for arrival times or I/O bursts, which the GUI can't run.
+    """
+    burst_times, invalid = [], []
+    column = None
+    for number, line in enumerate(content.splitlines(), 1):
+        fields = [field.strip() for field in next(csv.reader(io.StringIO(line)), [])]
+        if not any(fields):
+            continue
+        if column is None and not burst_times and not invalid and ('burst_time' in fields or 'bursts' in fields):
+            unsupported = [name for name in ('arrival_time', 'bursts') if name in fields]
+            if unsupported:
+                raise ValueError(f"Can't import the {' and '.join(unsupported)} column"
+                                 f"{'s' if len(unsupported) > 1 else ''}: {UNSUPPORTED_NOTE}")
+            column = fields.index('burst_time')
+            continue
+        if column is None and any(fields[2:]):
+            # The command-line runner reads a third field as the arrival time
+            raise ValueError(f"Line {number} has more than a process ID and a burst time: {UNSUPPORTED_NOTE}")
+        try:
+            burst_time = int(fields[column if column is not None else min(len(fields) - 1, 1)])
+        except (IndexError, ValueError):
+            burst_time = 0
+        if burst_time > 0:
+            burst_times.append(burst_time)
+        else:
+            invalid.append((number, line.strip()))
+    return burst_times, invalid
 
 class Menu:
     def __init__(self, root, controller):
@@ -11,7 +55,6 @@ class Menu:
         self.root.minsize(800, 600)     # Minimum size restriction
         self.controller = controller
         self.process_id_counter = 1
-        self.process_blocks = {}
         self.create_widgets()
 
     def create_widgets(self):
@@ -37,7 +80,7 @@ class Menu:
         self.left_frame = ttk.Frame(self.main_frame, borderwidth=2, relief="sunken")
         self.left_frame.grid(row=0, column=0, sticky="nsew", padx=5, pady=5)
         self.left_frame.grid_columnconfigure(0, weight=1)
-        self.left_frame.grid_rowconfigure(4, weight=1)
+        self.left_frame.grid_rowconfigure(2, weight=1)  # The process list takes the free space
 
         # Process Input Section (Left panel)
         self.input_frame = ttk.Frame(self.left_frame)
@@ -60,28 +103,62 @@ class Menu:
             row=0, column=0, padx=5, sticky="w")
         self.batch_text = tk.Text(self.batch_frame, height=5)
         self.batch_text.grid(row=1, column=0, padx=5, sticky="ew")
-        self.batch_button = ttk.Button(self.batch_frame, text="Add Batch Processes",
+        self.batch_buttons = ttk.Frame(self.batch_frame)
+        self.batch_buttons.grid(row=2, column=0, padx=5, pady=5, sticky="ew")
+        self.batch_buttons.grid_columnconfigure(0, weight=1)
+        self.batch_button = ttk.Button(self.batch_buttons, text="Add Batch Processes",
                                       command=self.add_batch_processes)
-        self.batch_button.grid(row=2, column=0, padx=5, pady=5, sticky="ew")
+        self.batch_button.grid(row=0, column=0, sticky="ew")
+        self.load_button = ttk.Button(self.batch_buttons, text="Load CSV...", command=self.load_batch_file)
+        self.load_button.grid(row=0, column=1, padx=(5, 0))
 
-        # Process Container (Left panel)
+        # Process list (Left panel): a Treeview only draws the visible rows, so long lists stay responsive
         self.process_container = ttk.Frame(self.left_frame)
         self.process_container.grid(row=2, column=0, padx=5, pady=5, sticky="nsew")
         self.process_container.grid_columnconfigure(0, weight=1)
-        self.process_container.grid_columnconfigure(1, weight=2)
-        self.process_container.grid_columnconfigure(2, weight=1)
-
-        # Process container header
-        ttk.Label(self.process_container, text="Process ID").grid(
-            row=0, column=0, padx=5, pady=5, sticky="w")
-        ttk.Label(self.process_container, text="Burst Time").grid(
-            row=0, column=1, padx=5, pady=5, sticky="w")
-        ttk.Label(self.process_container, text="Actions").grid(
-            row=0, column=2, padx=5, pady=5, sticky="e")
+        self.process_container.grid_rowconfigure(0, weight=1)
+        self.process_list = ttk.Treeview(self.process_container, columns=("process_id", "burst_time"),
+                                         show="headings", height=8)
+        self.process_list.heading("process_id", text="Process ID")
+        self.process_list.heading("burst_time", text="Burst Time (double-click to edit)")
+        self.process_list.column("process_id", width=80, anchor="w")
+        self.process_list.column("burst_time", width=160, anchor="w")
+        self.process_list.grid(row=0, column=0, sticky="nsew")
+        scrollbar = ttk.Scrollbar(self.process_container, orient=tk.VERTICAL, command=self.process_list.yview)
+        scrollbar.grid(row=0, column=1, sticky="ns")
+        self.process_list.configure(yscrollcommand=scrollbar.set)
+        self.process_list.bind("<Double-1>", self.edit_burst_time)
+        self.process_list.bind("<Delete>", lambda e: self.delete_process())
+        self.delete_button = ttk.Button(self.process_container, text="Delete Selected",
+                                        command=self.delete_process)
+        self.delete_button.grid(row=1, column=0, columnspan=2, pady=(5, 0), sticky="e")
 
         # Execution Section (Left panel)
         self.execution_frame = ttk.Frame(self.left_frame)
         self.execution_frame.grid(row=3, column=0, padx=5, pady=5, sticky="ew")
+        self.clock_frame = ttk.Frame(self.execution_frame)
+        self.clock_frame.pack(fill=tk.X, expand=True, pady=(0, 5))
+        self.clock_frame.grid_columnconfigure(1, weight=1)
+        ttk.Label(self.clock_frame, text="Clock:").grid(row=0, column=0, padx=5, sticky="w")
+        self.clock_mode = tk.StringVar(value=CLOCK_LABELS[0][0])
+        ttk.Combobox(self.clock_frame, textvariable=self.clock_mode, state="readonly",
+                     values=[label for label, _ in CLOCK_LABELS]).grid(row=0, column=1, padx=5, sticky="ew")
+        self.step_button = ttk.Button(self.clock_frame, text="Step", command=self.controller.step)
+        self.step_button.grid(row=0, column=2, padx=5)
+
+        # Speed on a log scale from 0.1x to 100x; applies to a running simulation too
+        ttk.Label(self.clock_frame, text="Speed:").grid(row=1, column=0, padx=5, sticky="w")
+        self.speed_exponent = tk.DoubleVar(value=0.0)
+        ttk.Scale(self.clock_frame, from_=math.log10(MIN_SPEED), to=math.log10(MAX_SPEED),
+                  variable=self.speed_exponent, command=self.change_speed).grid(row=1, column=1, padx=5, sticky="ew")
+        self.speed_label = ttk.Label(self.clock_frame, text="1x", width=6)
+        self.speed_label.grid(row=1, column=2, padx=5)
+
+        # Report where the time of each tick goes at the end of the run
+        self.profiling = tk.BooleanVar(value=False)
+        ttk.Checkbutton(self.clock_frame, text="Profile phases", variable=self.profiling,
+                        command=self.toggle_profiling).grid(row=2, column=0, columnspan=3, padx=5, sticky="w")
+
         self.start_button = ttk.Button(self.execution_frame, text="Start Simulation",
                                       command=self.start_simulation)
         self.start_button.pack(fill=tk.X, expand=True)
@@ -102,82 +179,121 @@ class Menu:
         try:
             if burst_time is None:
                 burst_time = int(self.burst_time_entry.get())
-            process_id = self.process_id_counter
-            self.process_id_counter += 1
-
-            row = len(self.process_blocks) + 1
-            ttk.Label(self.process_container, text=str(process_id)).grid(
-                row=row, column=0, padx=5, pady=2, sticky="w")
-
-            # Burst time entry
-            burst_var = tk.IntVar(value=burst_time)
-            burst_entry = ttk.Entry(self.process_container, textvariable=burst_var)
-            burst_entry.grid(row=row, column=1, padx=5, pady=2, sticky="ew")
-            burst_entry.bind("<FocusOut>", lambda e: self.update_burst_time(process_id, burst_var.get()))
-
-            # Delete button
-            delete_btn = ttk.Button(self.process_container, text="Delete",
-                                   command=lambda id=process_id: self.delete_process(id))
-            delete_btn.grid(row=row, column=2, padx=5, pady=2, sticky="e")
-
-            # Store references
-            self.process_blocks[process_id] = {
-                'row': row,
-                'widgets': [  # Keep track of all widgets in the row [[6]]
-                    self.process_container.grid_slaves(row=row, column=0)[0],
-                    burst_entry,
-                    delete_btn
-                ],
-                'burst_var': burst_var
-            }
-
-            self.controller.add_process(process_id, burst_time)
-            if 'burst_time_entry' in locals():
-                self.burst_time_entry.delete(0, tk.END)
-
         except ValueError:
             messagebox.showerror("Error", "Burst time must be an integer")
+            return
+        if burst_time <= 0:
+            messagebox.showerror("Error", "Burst time must be positive")
+            return
+        self.add_rows([burst_time])
+        self.burst_time_entry.delete(0, tk.END)
 
-    def delete_process(self, process_id):
-        if messagebox.askyesno("Confirm", f"Delete process {process_id}?"):
-            # Remove from controller
-            self.controller.remove_process(process_id)
+    def add_rows(self, burst_times):
+        """Add processes with new IDs to the list, and to the controller as one batch."""
+        processes = [(self.process_id_counter + i, burst_time) for i, burst_time in enumerate(burst_times)]
+        self.process_id_counter += len(processes)
+        for process_id, burst_time in processes:
+            self.process_list.insert("", tk.END, iid=str(process_id), values=(process_id, burst_time))
+        self.controller.add_processes(processes)
+        if processes:
+            self.process_list.see(str(processes[-1][0]))
 
-            # Remove from GUI [[6]]
-            for widget in self.process_blocks[process_id]['widgets']:
-                widget.destroy()
+    def delete_process(self, process_id=None):
+        """Delete process_id, or the selected processes."""
+        process_ids = [process_id] if process_id is not None else [int(item) for item in self.process_list.selection()]
+        if not process_ids:
+            return
+        prompt = f"Delete process {process_ids[0]}?" if len(process_ids) == 1 else f"Delete {len(process_ids)} processes?"
+        if messagebox.askyesno("Confirm", prompt):
+            self.controller.remove_processes(process_ids)
+            self.process_list.delete(*[str(process_id) for process_id in process_ids])
 
-            # Remove from tracking dictionary
-            del self.process_blocks[process_id]
+    def add_batch_processes(self):
+        content = self.batch_text.get("1.0", tk.END)
+        invalid = self.import_batch(content)
+        if invalid is None:
+            return  # Nothing was added, so the input stays as it is
+        # Invalid lines stay in the batch input to be fixed
+        self.batch_text.delete("1.0", tk.END)
+        self.batch_text.insert("1.0", "\n".join(line for _, line in invalid))
 
-            # Re-number remaining rows [[7]]
-            for idx, pid in enumerate(self.process_blocks.keys()):
-                row = idx + 1  # Skip header row
-                for col in range(3):
-                    widget = self.process_blocks[pid]['widgets'][col]
-                    widget.grid(row=row, column=col)
+    def load_batch_file(self):
+        path = filedialog.askopenfilename(title="Load processes",
+                                          filetypes=[("CSV files", "*.csv"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            with open(path, newline='') as f:
+                content = f.read()
+        except (OSError, UnicodeDecodeError) as e:
+            messagebox.showerror("Error", f"Can't read {path}: {e}")
+            return
+        self.import_batch(content)
 
-    def add_batch_processes(self):
-        content = self.batch_text.get("1.0", tk.END).strip()
-        lines = content.splitlines()
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                burst_time = int(line)
-                self.add_process_block(burst_time)
-            except ValueError:
-                messagebox.showerror("Error", f"Invalid burst time: {line}")
+    def import_batch(self, content):
+        """
+        Add every valid burst time of content at once and report the invalid
+        lines together. Returns them, or None if content can't be imported.
+        """
+        try:
+            burst_times, invalid = parse_batch(content)
+        except ValueError as e:
+            messagebox.showerror("Error", f"Nothing was added. {e}")
+            return None
+        self.add_rows(burst_times)
+        if invalid:
+            shown = "\n".join(f"Line {number}: {line}" for number, line in invalid[:MAX_ERRORS_SHOWN])
+            if len(invalid) > MAX_ERRORS_SHOWN:
+                shown += f"\n... and {len(invalid) - MAX_ERRORS_SHOWN} more"
+            messagebox.showerror("Error", f"Added {len(burst_times)} processes. "
+                                          f"{len(invalid)} lines have no valid burst time:\n{shown}")
+        return invalid
 
-        self.batch_text.delete("1.0", tk.END)
+    def edit_burst_time(self, event):
+        item = self.process_list.identify_row(event.y)
+        if not item or self.process_list.identify_column(event.x) != "#2":
+            return
+        # An entry laid over the cell, committed with Enter or by clicking elsewhere
+        x, y, width, height = self.process_list.bbox(item, "#2")
+        entry = ttk.Entry(self.process_list)
+        entry.insert(0, self.process_list.set(item, "burst_time"))
+        entry.select_range(0, tk.END)
+        entry.place(x=x, y=y, width=width, height=height)
+        entry.focus_set()
+
+        def finish(save):
+            if not entry.winfo_exists():
+                return
+            value = entry.get()
+            entry.destroy()
+            if save:
+                self.update_burst_time(int(item), value)
+        entry.bind("<Return>", lambda e: finish(True))
+        entry.bind("<FocusOut>", lambda e: finish(True))
+        entry.bind("<Escape>", lambda e: finish(False))
 
     def update_burst_time(self, process_id, new_time):
         try:
             new_time = int(new_time)
-            self.controller.update_process(process_id, new_time)
         except ValueError:
             messagebox.showerror("Error", "Invalid burst time value")
+            return
+        if new_time <= 0:
+            messagebox.showerror("Error", "Burst time must be positive")
+            return
+        self.controller.update_process(process_id, new_time)
+        self.process_list.set(str(process_id), "burst_time", new_time)
+
+    def speed(self):
+        return round(10 ** self.speed_exponent.get(), 1)
+
+    def change_speed(self, _value=None):
+        self.speed_label.config(text=f"{self.speed():g}x")
+        self.controller.set_speed(self.speed())
+
+    def toggle_profiling(self):
+        self.controller.set_profiling(self.profiling.get())
 
     def start_simulation(self):
-        self.controller.start_simulation()
\ No newline at end of file
+        mode = dict(CLOCK_LABELS)[self.clock_mode.get()]
+        self.controller.start_simulation(mode, self.speed())
\ No newline at end of file